@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.routes.scraper import EbayScraper
+from tests.title_corpus import fixture_pages
+
+# 用HTTP存档中的页面对比各解析后端：每页的解析耗时，以及提取的标题是否一致
+# python benchmarks/bench_parsers.py [轮数]
+
+BACKENDS = ('html.parser', 'lxml')
+
+def measure(scraper, html_content, rounds):
+    """返回(最快一轮的耗时（毫秒）, 标题列表)，耗时包括解析和提取"""
+    best = float('inf')
+    titles = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        titles, _ = scraper.extract_page(html_content)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, titles
+
+def main():
+    logging.disable(logging.CRITICAL)
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    scrapers = {name: EbayScraper(parser=name) for name in BACKENDS}
+    
+    totals = dict.fromkeys(BACKENDS, 0.0)
+    mismatches = 0
+    print(f"{'页面（查询参数）':<48} {'字节':>6} {'标题':>3} " + ' '.join(f'{name:>12}' for name in BACKENDS) + f" {'加速':>4}  结果")
+    for url, html_content in fixture_pages():
+        timings = {}
+        titles = {}
+        for name, scraper in scrapers.items():
+            timings[name], titles[name] = measure(scraper, html_content, rounds)
+            totals[name] += timings[name]
+        
+        identical = titles['lxml'] == titles['html.parser']
+        mismatches += not identical
+        print(
+            f"{url.split('?', 1)[-1]:<56} {len(html_content):>8} {len(titles['html.parser']):>5} "
+            + ' '.join(f"{timings[name]:>9.2f} ms" for name in BACKENDS)
+            + f" {timings['html.parser'] / timings['lxml']:>5.1f}x  {'一致' if identical else '不一致'}"
+        )
+    
+    print("合计: " + ', '.join(f"{name} {totals[name]:.2f} ms" for name in BACKENDS)
+          + f"，加速{totals['html.parser'] / totals['lxml']:.1f}x，标题不一致的页面{mismatches}个")
+    return 1 if mismatches else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.routes.scraper import EbayScraper
+from tests.title_corpus import legacy_is_valid_title, title_corpus
+
+# 对比预编译合并正则与重构前逐个匹配的标题验证耗时：python benchmarks/bench_title_validation.py [轮数]
+
+def measure(validate, corpus, rounds):
+    """返回最快一轮中每个标题的平均耗时（微秒）"""
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for title in corpus:
+            validate(title)
+        best = min(best, time.perf_counter() - started)
+    return best / len(corpus) * 1e6
+
+def main():
+    logging.disable(logging.CRITICAL)
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    corpus = title_corpus()
+    scraper = EbayScraper()
+    
+    mismatches = [title for title in corpus if scraper.is_valid_title(title) != legacy_is_valid_title(title)]
+    legacy_time = measure(legacy_is_valid_title, corpus, rounds)
+    current_time = measure(scraper.is_valid_title, corpus, rounds)
+    
+    print(f"语料: {len(corpus)}个标题，其中有效{sum(1 for title in corpus if legacy_is_valid_title(title))}个")
+    print(f"重构前: {legacy_time:.2f} us/标题")
+    print(f"当前:   {current_time:.2f} us/标题")
+    print(f"加速:   {legacy_time / current_time:.1f}x")
+    print(f"结果不一致: {len(mismatches)}个")
+    for title in mismatches[:10]:
+        print(f"  {title!r}")
+    return 1 if mismatches else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
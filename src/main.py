@@ -8,8 +8,14 @@ from flask_cors import CORS
 from src.models.user import db
 from src.routes.user import user_bp
 from src.routes.scraper import scraper_bp
+from src.routes.async_scraper import async_scraper_bp
 from src.routes.test_api import test_bp
 from src.routes.deepl_api import deepl_bp
+from src.routes.jobs import jobs_bp, job_manager
+from src.routes.history import history_bp
+from src.models.scrape_run import enable_sqlite_wal
+from src.utils.translation_cache import translation_cache
+from src.utils.translator_registry import translator_registry
 import logging
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
@@ -24,8 +30,11 @@ CORS(app)
 
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(scraper_bp, url_prefix='/api')
+app.register_blueprint(async_scraper_bp, url_prefix='/api')
 app.register_blueprint(test_bp, url_prefix='/api')
 app.register_blueprint(deepl_bp, url_prefix='/api')
+app.register_blueprint(jobs_bp, url_prefix='/api')
+app.register_blueprint(history_bp, url_prefix='/api')
 
 # 添加全局错误处理器
 @app.errorhandler(500)
@@ -48,8 +57,22 @@ app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirnam
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 with app.app_context():
+    enable_sqlite_wal(db.engine)
     db.create_all()
 
+# 共享的翻译客户端使用应用配置
+translator_registry.init_app(app)
+
+# 从数据库预热进程内翻译缓存
+translation_cache.init_app(app)
+
+# 直接运行本文件时以调试模式启动，提前设置以便区分重载器父进程
+if __name__ == '__main__':
+    app.debug = True
+
+# 启动后台抓取任务队列，并恢复重启前未完成的任务
+job_manager.init_app(app)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -0,0 +1,70 @@
+from datetime import datetime
+from src.models.user import db
+from src.utils.seen_items import SeenItemSet, item_key
+
+class ScrapeJob(db.Model):
+    id = db.Column(db.String(32), primary_key=True)
+    url = db.Column(db.Text, nullable=False)
+    max_pages = db.Column(db.Integer, nullable=False, default=4)
+    concurrency = db.Column(db.Integer, nullable=False, default=1)
+    bypass_cache = db.Column(db.Boolean, nullable=False, default=False)
+    # queued / running / completed / failed / cancelled
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)
+    # 每页的抓取结果：{"页码": 标题列表}，抓取失败的页面为null
+    pages = db.Column(db.JSON, nullable=False, default=dict)
+    # 每页标题对应的商品ID：{"页码": 商品ID列表}，解析不到商品ID的位置为null
+    item_ids = db.Column(db.JSON, nullable=False, default=dict)
+    error = db.Column(db.Text)
+    # 正在执行任务的进程标识和最近一次心跳时间，心跳超时的任务可由其他进程接管
+    owner = db.Column(db.String(64))
+    heartbeat_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<ScrapeJob {self.id} {self.status}>'
+    
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed', 'cancelled')
+    
+    def get_titles(self):
+        """按页码顺序合并所有页面的标题，按商品ID去重（解析不到商品ID的按标题去重）"""
+        pages = self.pages or {}
+        page_item_ids = self.item_ids or {}
+        seen = SeenItemSet()
+        unique_titles = []
+        for page_num in sorted(pages, key=int):
+            titles = pages[page_num] or []
+            item_ids = page_item_ids.get(page_num) or [None] * len(titles)
+            for title, item_id in zip(titles, item_ids):
+                if seen.add(item_key(item_id, title)):
+                    unique_titles.append(title)
+        return unique_titles
+    
+    def to_dict(self, include_titles=True):
+        pages = self.pages or {}
+        successful_pages = sum(1 for titles in pages.values() if titles)
+        result = {
+            'id': self.id,
+            'url': self.url,
+            'status': self.status,
+            'max_pages': self.max_pages,
+            'concurrency': self.concurrency,
+            'completed_pages': len(pages),
+            'successful_pages': successful_pages,
+            'page_progress': {
+                page_num: (len(titles) if titles is not None else None)
+                for page_num, titles in sorted(pages.items(), key=lambda item: int(item[0]))
+            },
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+        if include_titles:
+            titles = self.get_titles()
+            result['titles'] = titles
+            result['count'] = len(titles)
+        return result
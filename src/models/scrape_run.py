@@ -0,0 +1,153 @@
+from datetime import datetime
+from sqlalchemy import event, insert
+from src.models.user import db
+from src.utils.listings import ListingRecord
+
+# Listing表中由商品记录填充的列
+LISTING_FIELDS = (
+    'title', 'item_id', 'url', 'price', 'price_value', 'shipping', 'condition', 'sold_count', 'watch_count'
+)
+
+def enable_sqlite_wal(engine):
+    """SQLite使用WAL日志模式：写入时不阻塞读取，每页一个事务的提交开销也更低"""
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        # 后台任务和请求线程同时写入时等待锁释放，而不是立即报错
+        cursor.execute('PRAGMA busy_timeout=5000')
+        cursor.close()
+    
+    # 丢弃注册监听器之前建立的连接，让新连接都使用WAL
+    engine.dispose()
+
+class ScrapeRun(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    search_url = db.Column(db.Text, nullable=False, index=True)
+    # scrape / incremental / skip_seen
+    mode = db.Column(db.String(20), nullable=False, default='scrape')
+    max_pages = db.Column(db.Integer, nullable=False, default=4)
+    # running / completed / failed
+    status = db.Column(db.String(20), nullable=False, default='running')
+    page_count = db.Column(db.Integer, nullable=False, default=0)
+    listing_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime)
+    
+    pages = db.relationship('ScrapePage', backref='run', lazy='select', order_by='ScrapePage.page_num')
+    
+    def __repr__(self):
+        return f'<ScrapeRun {self.id} {self.status}>'
+    
+    @classmethod
+    def start(cls, search_url, mode='scrape', max_pages=4):
+        """创建一条抓取记录"""
+        run = cls(search_url=search_url, mode=mode, max_pages=max_pages, status='running')
+        db.session.add(run)
+        db.session.commit()
+        return run
+    
+    def add_page(self, page_num, items, item_ids=None):
+        """保存一页的抓取结果：页面和该页的全部商品在同一个事务中批量插入"""
+        now = datetime.utcnow()
+        page = ScrapePage(
+            run_id=self.id,
+            page_num=page_num,
+            success=items is not None,
+            listing_count=len(items or []),
+            fetched_at=now
+        )
+        db.session.add(page)
+        db.session.flush()
+        
+        if items:
+            if item_ids is None:
+                item_ids = [None] * len(items)
+            rows = []
+            for position, (item, item_id) in enumerate(zip(items, item_ids)):
+                if isinstance(item, ListingRecord):
+                    row = {field: getattr(item, field) for field in LISTING_FIELDS}
+                else:
+                    row = dict.fromkeys(LISTING_FIELDS)
+                    row['title'] = item
+                    row['item_id'] = item_id
+                row.update(run_id=self.id, page_id=page.id, position=position, scraped_at=now)
+                rows.append(row)
+            # 传入字典列表时SQLAlchemy使用executemany批量插入
+            db.session.execute(insert(Listing), rows)
+        
+        self.page_count += 1
+        self.listing_count += len(items or [])
+        db.session.commit()
+        return page
+    
+    def finish(self, status='completed'):
+        self.status = status
+        self.finished_at = datetime.utcnow()
+        db.session.commit()
+    
+    def to_dict(self, include_listings=False):
+        result = {
+            'id': self.id,
+            'search_url': self.search_url,
+            'mode': self.mode,
+            'max_pages': self.max_pages,
+            'status': self.status,
+            'page_count': self.page_count,
+            'listing_count': self.listing_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+        if include_listings:
+            result['pages'] = [page.to_dict() for page in self.pages]
+            listings = Listing.query.filter_by(run_id=self.id).order_by(Listing.page_id, Listing.position).all()
+            result['listings'] = [listing.to_dict() for listing in listings]
+        return result
+
+class ScrapePage(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('scrape_run.id'), nullable=False, index=True)
+    page_num = db.Column(db.Integer, nullable=False)
+    success = db.Column(db.Boolean, nullable=False, default=True)
+    listing_count = db.Column(db.Integer, nullable=False, default=0)
+    fetched_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ScrapePage {self.run_id}:{self.page_num}>'
+    
+    def to_dict(self):
+        return {
+            'page_num': self.page_num,
+            'success': self.success,
+            'listing_count': self.listing_count,
+            'fetched_at': self.fetched_at.isoformat() if self.fetched_at else None
+        }
+
+class Listing(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('scrape_run.id'), nullable=False, index=True)
+    page_id = db.Column(db.Integer, db.ForeignKey('scrape_page.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    title = db.Column(db.Text, nullable=False)
+    item_id = db.Column(db.String(20), index=True)
+    url = db.Column(db.Text)
+    price = db.Column(db.String(100))
+    price_value = db.Column(db.Float)
+    shipping = db.Column(db.String(200))
+    condition = db.Column(db.String(200))
+    sold_count = db.Column(db.Integer)
+    watch_count = db.Column(db.Integer)
+    scraped_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<Listing {self.item_id} {self.title[:30]}>'
+    
+    def to_dict(self):
+        result = {field: getattr(self, field) for field in LISTING_FIELDS}
+        result['run_id'] = self.run_id
+        result['scraped_at'] = self.scraped_at.isoformat() if self.scraped_at else None
+        return result
@@ -0,0 +1,47 @@
+from datetime import datetime
+from src.models.user import db
+from src.utils.seen_items import SeenItemSet, search_key
+
+class SearchSeenItems(db.Model):
+    # 搜索URL（去掉页码参数）规范化后的sha256
+    search_key = db.Column(db.String(64), primary_key=True)
+    search_url = db.Column(db.Text, nullable=False)
+    # 已处理过的商品键（商品ID或标题哈希），按升序保存的uint64数组
+    item_ids = db.Column(db.LargeBinary, nullable=False, default=b'')
+    # 与item_ids一一对应的标题哈希（uint32数组），用于发现标题有变化的商品
+    title_hashes = db.Column(db.LargeBinary, nullable=False, default=b'')
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SearchSeenItems {self.search_key[:12]} {self.item_count}>'
+    
+    @classmethod
+    def load(cls, url):
+        """读取该搜索之前已处理过的商品ID集合"""
+        record = db.session.get(cls, search_key(url))
+        if record is None:
+            return SeenItemSet()
+        return SeenItemSet(record.item_ids, record.title_hashes)
+    
+    @classmethod
+    def save(cls, url, seen):
+        """保存该搜索已处理过的商品ID集合"""
+        key = search_key(url)
+        record = db.session.get(cls, key)
+        if record is None:
+            record = cls(search_key=key, search_url=url)
+            db.session.add(record)
+        record.item_ids, record.title_hashes = seen.serialize()
+        record.item_count = len(seen)
+        db.session.commit()
+        return record
+    
+    def to_dict(self):
+        return {
+            'search_url': self.search_url,
+            'item_count': self.item_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,27 @@
+from datetime import datetime
+from src.models.user import db
+
+class TranslationCacheEntry(db.Model):
+    # 原文、源语言（空字符串表示自动检测）、目标语言和翻译引擎共同确定一条翻译
+    source_term = db.Column(db.String(500), primary_key=True)
+    source_lang = db.Column(db.String(10), primary_key=True, default='')
+    target_lang = db.Column(db.String(10), primary_key=True)
+    engine = db.Column(db.String(20), primary_key=True, default='deepl')
+    translation = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # 最近一次被使用的时间，启动预热时优先加载最近使用的翻译
+    last_used_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<TranslationCacheEntry {self.source_term} -> {self.target_lang}>'
+    
+    def to_dict(self):
+        return {
+            'source_term': self.source_term,
+            'source_lang': self.source_lang or None,
+            'target_lang': self.target_lang,
+            'engine': self.engine,
+            'translation': self.translation,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_used_at': self.last_used_at.isoformat() if self.last_used_at else None
+        }
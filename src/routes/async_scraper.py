@@ -0,0 +1,283 @@
+from flask import Blueprint, jsonify, request
+import time
+import atexit
+import asyncio
+import threading
+import aiohttp
+from urllib.parse import urlparse
+import logging
+from src.routes.scraper import EbayScraper, PaginationTracker, host_throttle, MAX_PAGES_LIMIT, MAX_PAGE_CONCURRENCY
+from src.utils.http_pool import DEFAULT_HEADERS
+from src.utils.page_cache import get_page_cache
+from src.utils.title_parsers import get_parser_backend
+from src.utils.rate_limiter import rate_limiter, parse_retry_after
+from src.utils.circuit_breaker import circuit_breaker, CircuitOpenError
+
+async_scraper_bp = Blueprint('async_scraper', __name__)
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# aiohttp未安装brotli时无法解码br，这里只声明gzip/deflate
+ASYNC_HEADERS = dict(DEFAULT_HEADERS, **{'Accept-Encoding': 'gzip, deflate'})
+
+class AsyncEbayScraper(EbayScraper):
+    """基于asyncio/aiohttp的抓取引擎，接口与EbayScraper保持一致"""
+    def __init__(self, session=None, bypass_cache=False, parser=None, records=False):
+        # 不创建requests.Session，HTTP请求由aiohttp完成
+        self.session = session
+        self._owns_session = session is None
+        self.bypass_cache = bypass_cache
+        self.parser_backend = get_parser_backend(parser)
+        self.records = records
+    
+    async def __aenter__(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                headers=ASYNC_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def scrape_page_with_retry(self, url, max_retries=3):
+        """带重试机制的异步页面抓取，响应结果会反馈给自适应限速器和熔断器"""
+        for attempt in range(max_retries):
+            # 域名熔断时直接失败，不再重试
+            circuit_breaker.before_request(url)
+            try:
+                if attempt > 0:
+                    # 重试同样需要令牌，并且至少等待一个带抖动的退避时间
+                    delay = max(rate_limiter.backoff_delay(attempt - 1), rate_limiter.reserve_delay(url))
+                    await asyncio.sleep(delay)
+                
+                started = time.monotonic()
+                try:
+                    async with self.session.get(url) as response:
+                        rate_limiter.record_response(
+                            url,
+                            response.status,
+                            time.monotonic() - started,
+                            parse_retry_after(response.headers.get('Retry-After'))
+                        )
+                        
+                        # 检查是否被重定向到错误页面
+                        final_url = str(response.url).lower()
+                        blocked = 'error' in final_url or 'blocked' in final_url
+                        circuit_breaker.record_response(url, response.status, blocked)
+                        response.raise_for_status()
+                        
+                        if blocked:
+                            rate_limiter.record_response(url)
+                            raise aiohttp.ClientError("可能被反爬虫机制阻断")
+                        
+                        return await response.text()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    rate_limiter.record_response(url)
+                    circuit_breaker.record_failure(url)
+                    raise
+            
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"第{attempt + 1}次尝试抓取失败: {str(e)}")
+                if attempt >= max_retries - 1:
+                    raise e
+    
+    async def fetch_page(self, url):
+        """异步获取页面HTML，优先读取页面缓存，返回(HTML, 是否命中缓存)
+        
+        新下载的页面不在这里缓存，由调用方解析出标题后调用cache_page
+        """
+        page_cache = get_page_cache()
+        if not self.bypass_cache:
+            html_content = await asyncio.to_thread(page_cache.get, url)
+            if html_content is not None:
+                logger.info(f"页面缓存命中: {url}")
+                return html_content, True
+        
+        # 熔断时不必排队等待令牌，立即失败
+        circuit_breaker.raise_if_open(url)
+        # 与同步路径共享域名级别的并发上限和令牌桶
+        async with host_throttle.acquire_async(url):
+            html_content = await self.scrape_page_with_retry(url)
+        return html_content, False
+    
+    async def scrape_page(self, page_num, url):
+        """异步抓取并解析单个页面，返回(标题列表, 分页信息)，失败时均为None"""
+        try:
+            logger.info(f"正在抓取第{page_num}页: {url}")
+            
+            html_content, from_cache = await self.fetch_page(url)
+            # 解析是CPU密集操作，放到线程中执行避免阻塞事件循环
+            titles, page_info = await asyncio.to_thread(self.extract_page, html_content)
+            if not from_cache:
+                await asyncio.to_thread(self.cache_page, url, html_content, titles)
+            
+            if titles:
+                logger.info(f"第{page_num}页找到{len(titles)}个标题")
+            else:
+                logger.warning(f"第{page_num}页未找到任何标题")
+            return titles, page_info
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+            logger.error(f"抓取第{page_num}页时发生网络错误: {str(e)}")
+            return None, None
+        except Exception as e:
+            logger.error(f"处理第{page_num}页时发生未知错误: {str(e)}")
+            return None, None
+    
+    async def scrape_titles(self, start_url, max_pages=4, concurrency=1):
+        """异步抓取商品标题，结果按页码顺序返回"""
+        try:
+            page_urls = self.build_page_urls(start_url, max_pages)
+            if not page_urls:
+                return [], 0
+            
+            semaphore = asyncio.Semaphore(max(1, min(concurrency, MAX_PAGE_CONCURRENCY)))
+            tracker = PaginationTracker(start_url, max_pages)
+            
+            async def fetch(page_num, url):
+                async with semaphore:
+                    # 排队期间已确定超出结果范围的页面不再抓取
+                    if not tracker.should_fetch(page_num):
+                        return None
+                    titles, page_info = await self.scrape_page(page_num, url)
+                    if tracker.update(page_num, titles, page_info):
+                        return None
+                    return titles, page_info and page_info['item_ids']
+            
+            # 先抓取第1页，根据结果总数和分页信息确定实际需要抓取的页数
+            first_page, first_url = page_urls[0]
+            page_results = [await fetch(first_page, first_url)]
+            page_results += await asyncio.gather(*(fetch(page_num, url) for page_num, url in page_urls[1:]))
+            
+            all_titles = []
+            all_item_ids = []
+            successful_pages = 0
+            for (page_num, _), result in zip(page_urls, page_results):
+                # 乱序完成时，超出结果范围的页面可能先于原始页完成而未被识别为重复页
+                if result and result[0] and tracker.should_fetch(page_num):
+                    all_titles.extend(result[0])
+                    all_item_ids.extend(result[1])
+                    successful_pages += 1
+            
+            # 去重
+            unique_titles = self.dedupe(all_titles, all_item_ids)
+            logger.info(f"总共抓取到{len(unique_titles)}个唯一标题，成功抓取{successful_pages}页")
+            
+            return unique_titles, successful_pages
+        
+        except Exception as e:
+            logger.error(f"异步抓取过程失败: {str(e)}")
+            return [], 0
+
+class AsyncScrapeEngine:
+    """进程内共享的异步抓取引擎：后台线程运行一个常驻事件循环，所有异步抓取在其中执行并共用同一个aiohttp会话
+    
+    Flask为每次调用异步视图单独创建事件循环，而aiohttp会话不能跨事件循环使用，因此抓取交给常驻事件循环执行，
+    各请求之间才能复用连接。注意每个请求在返回前仍占用一个WSGI工作线程，单进程同时进行的抓取数受工作线程数限制；
+    要让单进程同时处理数百个抓取，需要改用原生asyncio的框架（如Quart）提供该接口
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._session = None
+    
+    def _get_loop(self):
+        """获取常驻事件循环，首次使用时启动后台线程"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='async-scraper', daemon=True).start()
+                self._loop = loop
+            return self._loop
+    
+    def _get_session(self):
+        """获取共享的aiohttp会话（只在常驻事件循环中调用）"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=ASYNC_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._session
+    
+    async def run(self, coro):
+        """在常驻事件循环中执行协程，调用方可在任意事件循环中等待结果"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._get_loop()))
+    
+    async def scrape_titles(self, start_url, max_pages=4, concurrency=1, bypass_cache=False):
+        """使用共享会话异步抓取商品标题，返回(标题列表, 成功页数)"""
+        async def scrape():
+            scraper = AsyncEbayScraper(session=self._get_session(), bypass_cache=bypass_cache)
+            return await scraper.scrape_titles(start_url, max_pages=max_pages, concurrency=concurrency)
+        return await self.run(scrape())
+    
+    def close(self):
+        """关闭共享会话并停止事件循环"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        try:
+            if self._session is not None:
+                asyncio.run_coroutine_threadsafe(self._session.close(), loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"关闭异步抓取会话失败: {str(e)}")
+        finally:
+            self._session = None
+            loop.call_soon_threadsafe(loop.stop)
+
+async_engine = AsyncScrapeEngine()
+atexit.register(async_engine.close)
+
+@async_scraper_bp.route('/scrape-async', methods=['POST'])
+async def scrape_ebay_async():
+    """eBay商品标题抓取API端点（异步版本，抓取在共享的常驻事件循环中执行）"""
+    try:
+        data = request.get_json()
+        if not data or 'url' not in data:
+            return jsonify({'error': '请提供eBay页面URL'}), 400
+        
+        url = data['url'].strip()
+        
+        # 验证URL是否为eBay域名
+        parsed_url = urlparse(url)
+        if not parsed_url.netloc or 'ebay' not in parsed_url.netloc.lower():
+            return jsonify({'error': '请提供有效的eBay页面URL'}), 400
+        
+        # 抓取页数和页面并发数（可选参数）
+        try:
+            max_pages = int(data.get('max_pages', 4))
+            concurrency = int(data.get('concurrency', 1))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'max_pages和concurrency必须是整数'}), 400
+        max_pages = max(1, min(max_pages, MAX_PAGES_LIMIT))
+        concurrency = max(1, min(concurrency, MAX_PAGE_CONCURRENCY))
+        bypass_cache = bool(data.get('bypass_cache', False))
+        
+        # 在共享的事件循环和aiohttp会话中抓取，复用之前请求建立的连接
+        titles, successful_pages = await async_engine.scrape_titles(
+            url, max_pages=max_pages, concurrency=concurrency, bypass_cache=bypass_cache
+        )
+        
+        if not titles:
+            return jsonify({
+                'error': '未能抓取到任何商品标题，请检查URL是否正确或稍后重试',
+                'successful_pages': successful_pages
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'titles': titles,
+            'count': len(titles),
+            'successful_pages': successful_pages,
+            'message': f'成功抓取{successful_pages}页，共获得{len(titles)}个商品标题'
+        })
+    
+    except Exception as e:
+        logger.error(f"异步抓取过程中发生错误: {str(e)}")
+        return jsonify({'error': f'抓取失败: {str(e)}'}), 500
@@ -2,7 +2,11 @@ from flask import Blueprint, jsonify, request
 import logging
 from collections import Counter
 import re
-import deepl
+from src.utils.translation_cache import translation_cache
+from src.utils.translation_batcher import TranslationBatcher
+from src.utils.translation_dispatcher import translation_dispatcher
+from src.utils.translator_registry import translator_registry
+from src.routes.scraper import MAX_TOP_KEYWORDS
 
 deepl_bp = Blueprint('deepl', __name__)
 
@@ -22,13 +26,16 @@ def analyze_with_deepl():
         
         titles = data['titles']
         
-        # 初始化DeepL客户端
         try:
-            deepl_client = deepl.Translator("55f08e38-e61d-4259-be1f-df716be00456:fx")
-            logger.info("DeepL客户端初始化成功")
-        except Exception as e:
-            logger.error(f"DeepL客户端初始化失败: {str(e)}")
-            return jsonify({'error': f'DeepL初始化失败: {str(e)}'}), 500
+            top_n = int(data.get('top_n', 20))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'top_n必须是整数'}), 400
+        top_n = max(1, min(top_n, MAX_TOP_KEYWORDS))
+        
+        # 使用进程内共享的DeepL客户端
+        deepl_client = translator_registry.get()
+        if deepl_client is None:
+            return jsonify({'error': 'DeepL客户端不可用，请检查DEEPL_AUTH_KEY配置'}), 500
         
         # 简单的关键词分析
         all_words = []
@@ -43,7 +50,7 @@ def analyze_with_deepl():
             all_words.extend(filtered_words)
         
         word_counts = Counter(all_words)
-        top_keywords = word_counts.most_common(20)  # 减少到20个关键词以降低API调用量
+        top_keywords = word_counts.most_common(top_n)  # 默认20个关键词，已翻译过的关键词由翻译缓存提供
         
         # 构建结果，使用DeepL翻译
         keywords_result = []
@@ -56,14 +63,13 @@ def analyze_with_deepl():
             # 批量翻译到中文
             logger.info(f"开始翻译{len(keywords_to_translate)}个关键词")
             
-            # 将关键词用换行符连接进行批量翻译
-            text_to_translate = '\n'.join(keywords_to_translate)
-            result = deepl_client.translate_text(text_to_translate, target_lang="ZH")
-            chinese_translations = result.text.split('\n')
+            def translate_misses(misses):
+                # 与其他并发请求的未命中词合并后发送，每个关键词作为独立文本，翻译结果与关键词一一对应
+                batcher = TranslationBatcher(deepl_client)
+                return translation_dispatcher.translate(misses, "ZH", lambda terms: batcher.translate(terms, "ZH"))
             
-            # 确保翻译结果数量匹配
-            while len(chinese_translations) < len(keywords_to_translate):
-                chinese_translations.append(keywords_to_translate[len(chinese_translations)])
+            # 已缓存的关键词直接使用缓存的翻译，只翻译未命中的部分
+            chinese_translations = translation_cache.translate(keywords_to_translate, "ZH", translate_misses)
             
             logger.info("DeepL翻译完成")
             
@@ -107,3 +113,16 @@ def analyze_with_deepl():
         logger.error(f"DeepL分析API错误: {str(e)}", exc_info=True)
         return jsonify({'error': f'分析失败: {str(e)}'}), 500
 
+@deepl_bp.route('/translation-cache-stats', methods=['GET'])
+def translation_cache_stats():
+    """返回翻译缓存的命中率和节省的字符数、并发请求合并的统计，以及翻译客户端和连接的复用情况"""
+    try:
+        return jsonify({
+            'success': True,
+            'translation_cache': translation_cache.get_stats(),
+            'translation_dispatcher': translation_dispatcher.get_stats(),
+            'translator': translator_registry.get_stats()
+        })
+    except Exception as e:
+        logger.error(f"获取翻译缓存统计失败: {str(e)}")
+        return jsonify({'error': f'获取统计失败: {str(e)}'}), 500
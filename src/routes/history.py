@@ -0,0 +1,82 @@
+from flask import Blueprint, jsonify, request
+import logging
+from src.models.user import db
+from src.models.scrape_run import ScrapeRun, Listing
+
+history_bp = Blueprint('history', __name__)
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 单次查询返回的最大记录数
+MAX_QUERY_LIMIT = 500
+
+def get_limit(default=50):
+    try:
+        limit = int(request.args.get('limit', default))
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, MAX_QUERY_LIMIT))
+
+@history_bp.route('/runs', methods=['GET'])
+def list_runs():
+    """查询历史抓取记录，可按搜索URL筛选，按时间倒序返回"""
+    try:
+        query = ScrapeRun.query
+        url = request.args.get('url')
+        if url:
+            query = query.filter(ScrapeRun.search_url == url.strip())
+        runs = query.order_by(ScrapeRun.created_at.desc()).limit(get_limit()).all()
+        
+        return jsonify({
+            'success': True,
+            'runs': [run.to_dict() for run in runs],
+            'count': len(runs)
+        })
+    
+    except Exception as e:
+        logger.error(f"查询抓取记录失败: {str(e)}")
+        return jsonify({'error': f'查询抓取记录失败: {str(e)}'}), 500
+
+@history_bp.route('/runs/<int:run_id>', methods=['GET'])
+def get_run(run_id):
+    """查询一次抓取的每页结果和全部商品"""
+    try:
+        run = db.session.get(ScrapeRun, run_id)
+        if run is None:
+            return jsonify({'error': '抓取记录不存在'}), 404
+        
+        return jsonify({
+            'success': True,
+            'run': run.to_dict(include_listings=True)
+        })
+    
+    except Exception as e:
+        logger.error(f"查询抓取记录失败: {str(e)}")
+        return jsonify({'error': f'查询抓取记录失败: {str(e)}'}), 500
+
+@history_bp.route('/items/<item_id>/history', methods=['GET'])
+def get_item_history(item_id):
+    """查询某个商品在历次抓取中的记录（标题、价格等随时间的变化）"""
+    try:
+        listings = (
+            Listing.query
+            .filter(Listing.item_id == item_id)
+            .order_by(Listing.scraped_at.desc())
+            .limit(get_limit())
+            .all()
+        )
+        if not listings:
+            return jsonify({'error': '没有该商品的抓取记录'}), 404
+        
+        return jsonify({
+            'success': True,
+            'item_id': item_id,
+            'history': [listing.to_dict() for listing in listings],
+            'count': len(listings)
+        })
+    
+    except Exception as e:
+        logger.error(f"查询商品历史失败: {str(e)}")
+        return jsonify({'error': f'查询商品历史失败: {str(e)}'}), 500
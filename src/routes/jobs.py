@@ -0,0 +1,251 @@
+from flask import Blueprint, jsonify
+import os
+import atexit
+import uuid
+import socket
+import threading
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from src.models.user import db
+from src.models.scrape_job import ScrapeJob
+from src.routes.scraper import EbayScraper
+
+jobs_bp = Blueprint('jobs', __name__)
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 后台抓取任务的工作线程数（可通过环境变量覆盖）
+SCRAPE_JOB_WORKERS = int(os.environ.get('SCRAPE_JOB_WORKERS', 2))
+JOB_HEARTBEAT_INTERVAL = float(os.environ.get('SCRAPE_JOB_HEARTBEAT', 15))        # 刷新心跳和检查待执行任务的间隔（秒）
+JOB_STALE_TIMEOUT = float(os.environ.get('SCRAPE_JOB_STALE_TIMEOUT', 60))         # 心跳超过该时间未更新的运行中任务视为已中断（秒）
+
+def is_serving_process(app):
+    """调试模式下Werkzeug重载器的父进程只负责监视文件变化，真正处理请求的是带WERKZEUG_RUN_MAIN的子进程"""
+    if app.debug:
+        return os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+    return True
+
+class JobManager:
+    """后台抓取任务队列：任务状态保存在SQLite中，由工作线程池执行
+    
+    多个进程共享同一个数据库时，任务通过条件更新原子地认领，执行中的任务定期刷新心跳，
+    只有心跳超时的任务才会被重新放回队列
+    """
+    def __init__(self, workers=SCRAPE_JOB_WORKERS, heartbeat_interval=JOB_HEARTBEAT_INTERVAL,
+                 stale_timeout=JOB_STALE_TIMEOUT):
+        self.workers = workers
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_timeout = stale_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.app = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._cancel_requested = set()
+        self._submitted = set()
+        self._stop = threading.Event()
+    
+    def init_app(self, app):
+        """绑定Flask应用；在处理请求的进程中恢复中断的任务并启动心跳线程"""
+        self.app = app
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scrape-job')
+        if not is_serving_process(app):
+            logger.info("当前为重载器父进程，不恢复抓取任务")
+            return
+        
+        self.recover_jobs()
+        threading.Thread(target=self._heartbeat_loop, name='scrape-job-heartbeat', daemon=True).start()
+    
+    def recover_jobs(self):
+        """把心跳超时的运行中任务放回队列，并提交本进程尚未提交的排队任务，返回提交的任务数"""
+        try:
+            with self.app.app_context():
+                stale_before = datetime.utcnow() - timedelta(seconds=self.stale_timeout)
+                requeued = ScrapeJob.query.filter(
+                    ScrapeJob.status == 'running',
+                    db.or_(ScrapeJob.heartbeat_at.is_(None), ScrapeJob.heartbeat_at < stale_before)
+                ).update({'status': 'queued', 'owner': None}, synchronize_session=False)
+                db.session.commit()
+                if requeued:
+                    logger.info(f"{requeued}个抓取任务的心跳已超时，重新放回队列")
+                
+                queued_ids = [job_id for (job_id,) in
+                              db.session.query(ScrapeJob.id).filter(ScrapeJob.status == 'queued').all()]
+            
+            submitted = 0
+            for job_id in queued_ids:
+                if self._submit(job_id):
+                    submitted += 1
+            if submitted:
+                logger.info(f"恢复了{submitted}个未完成的抓取任务")
+            return submitted
+        except Exception as e:
+            logger.error(f"恢复抓取任务失败: {str(e)}")
+            return 0
+    
+    def close(self):
+        self._stop.set()
+    
+    def _submit(self, job_id):
+        """提交任务到线程池，已经提交且尚未结束的任务不会重复提交"""
+        with self._lock:
+            if job_id in self._submitted:
+                return False
+            self._submitted.add(job_id)
+        self._executor.submit(self._run_job, job_id)
+        return True
+    
+    def _heartbeat_loop(self):
+        """定期刷新本进程执行中任务的心跳，并接管其他进程中断的任务"""
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                with self.app.app_context():
+                    ScrapeJob.query.filter_by(owner=self.owner, status='running').update(
+                        {'heartbeat_at': datetime.utcnow()}, synchronize_session=False
+                    )
+                    db.session.commit()
+            except Exception as e:
+                logger.error(f"刷新抓取任务心跳失败: {str(e)}")
+            self.recover_jobs()
+    
+    def _claim(self, job_id):
+        """原子地把排队中的任务标记为本进程执行，已被其他进程认领或已取消时返回False"""
+        claimed = ScrapeJob.query.filter_by(id=job_id, status='queued').update(
+            {'status': 'running', 'owner': self.owner, 'heartbeat_at': datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.session.commit()
+        return claimed == 1
+    
+    def enqueue(self, url, max_pages=4, concurrency=1, bypass_cache=False):
+        """创建任务并放入队列，返回任务对象"""
+        job = ScrapeJob(
+            id=uuid.uuid4().hex,
+            url=url,
+            max_pages=max_pages,
+            concurrency=concurrency,
+            bypass_cache=bypass_cache,
+            status='queued',
+            pages={},
+            item_ids={}
+        )
+        db.session.add(job)
+        db.session.commit()
+        
+        self._submit(job.id)
+        logger.info(f"抓取任务{job.id}已加入队列")
+        return job
+    
+    def cancel(self, job_id):
+        """取消任务，返回取消后的任务对象；任务不存在时返回None"""
+        job = db.session.get(ScrapeJob, job_id)
+        if job is None:
+            return None
+        if job.is_finished:
+            return job
+        
+        with self._lock:
+            self._cancel_requested.add(job_id)
+        if job.status == 'queued':
+            job.status = 'cancelled'
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+        return job
+    
+    def is_cancel_requested(self, job_id):
+        with self._lock:
+            return job_id in self._cancel_requested
+    
+    def _run_job(self, job_id):
+        """在工作线程中执行抓取任务，每完成一页就保存进度"""
+        with self.app.app_context():
+            try:
+                if not self._claim(job_id):
+                    return
+                job = db.session.get(ScrapeJob, job_id)
+                logger.info(f"开始执行抓取任务{job_id}")
+                
+                # 恢复任务时跳过已经完成的页面
+                done_pages = {int(page_num) for page_num in (job.pages or {})}
+                scraper = EbayScraper(bypass_cache=job.bypass_cache)
+                page_iter = scraper.iter_page_titles(
+                    job.url, job.max_pages, job.concurrency, skip_pages=done_pages
+                )
+                try:
+                    for page_num, titles, item_ids in page_iter:
+                        pages = dict(job.pages or {})
+                        pages[str(page_num)] = titles
+                        job.pages = pages
+                        # 保存商品ID，合并结果时按商品ID去重
+                        page_item_ids = dict(job.item_ids or {})
+                        page_item_ids[str(page_num)] = item_ids
+                        job.item_ids = page_item_ids
+                        job.heartbeat_at = datetime.utcnow()
+                        db.session.commit()
+                        
+                        if self.is_cancel_requested(job_id):
+                            job.status = 'cancelled'
+                            break
+                    else:
+                        job.status = 'completed' if job.get_titles() else 'failed'
+                        if job.status == 'failed':
+                            job.error = '未能抓取到任何商品标题，请检查URL是否正确或稍后重试'
+                finally:
+                    page_iter.close()
+                
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                logger.info(f"抓取任务{job_id}结束，状态: {job.status}")
+            
+            except Exception as e:
+                logger.error(f"抓取任务{job_id}执行失败: {str(e)}")
+                db.session.rollback()
+                job = db.session.get(ScrapeJob, job_id)
+                if job is not None:
+                    job.status = 'failed'
+                    job.error = str(e)
+                    job.finished_at = datetime.utcnow()
+                    db.session.commit()
+            finally:
+                with self._lock:
+                    self._cancel_requested.discard(job_id)
+                    self._submitted.discard(job_id)
+
+job_manager = JobManager()
+atexit.register(job_manager.close)
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """查询后台抓取任务的状态、每页进度和结果"""
+    try:
+        job = db.session.get(ScrapeJob, job_id)
+        if job is None:
+            return jsonify({'error': '任务不存在'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job.to_dict()
+        })
+    
+    except Exception as e:
+        logger.error(f"查询任务失败: {str(e)}")
+        return jsonify({'error': f'查询任务失败: {str(e)}'}), 500
+
+@jobs_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """取消后台抓取任务"""
+    try:
+        job = job_manager.cancel(job_id)
+        if job is None:
+            return jsonify({'error': '任务不存在'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job.to_dict(include_titles=False)
+        })
+    
+    except Exception as e:
+        logger.error(f"取消任务失败: {str(e)}")
+        return jsonify({'error': f'取消任务失败: {str(e)}'}), 500
@@ -1,12 +1,32 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 import requests
-from bs4 import BeautifulSoup
 import time
 import re
+import json
+import math
+import hashlib
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED, TimeoutError as FuturesTimeoutError
+from contextlib import contextmanager, asynccontextmanager
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 from collections import Counter
 import logging
-import deepl
+from src.utils.http_pool import get_http_pool
+from src.utils.page_cache import get_page_cache
+from src.utils.title_parsers import TITLE_STRATEGIES, StreamingPageParser, get_parser_backend
+from src.utils.listings import build_listing, parse_item_id
+from src.utils.marketplaces import MARKETPLACES, normalize_marketplace, build_search_url
+from src.utils.translation_cache import translation_cache
+from src.utils.translation_batcher import TranslationBatcher, TRANSLATION_TIMEOUT
+from src.utils.translation_dispatcher import translation_dispatcher
+from src.utils.translator_registry import translator_registry
+from src.utils.seen_items import SeenItemSet, item_key, title_hash
+from src.models.user import db
+from src.models.seen_items import SearchSeenItems
+from src.models.scrape_run import ScrapeRun
+from src.utils.rate_limiter import rate_limiter, parse_retry_after
+from src.utils.circuit_breaker import circuit_breaker, STATE_CLOSED
 
 scraper_bp = Blueprint('scraper', __name__)
 
@@ -14,15 +34,198 @@ scraper_bp = Blueprint('scraper', __name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 并发抓取配置
+MAX_PAGES_LIMIT = 50          # 单次请求允许抓取的最大页数
+MAX_PAGE_CONCURRENCY = 8      # 单次请求允许的最大页面并发数
+PER_HOST_CONCURRENCY = 4      # 同一域名同时进行的请求上限
+HOST_SLOT_POLL_INTERVAL = 0.02 # 异步请求等待域名并发名额时的轮询间隔（秒）
+MAX_BATCH_URLS = 50           # 批量抓取单次请求允许的最大URL数
+MAX_TOP_KEYWORDS = 500        # 关键词分析单次请求允许返回的最大关键词数
+DEFAULT_ITEMS_PER_PAGE = 60   # eBay搜索结果默认每页商品数（可由_ipg参数修改）
+STREAM_CHUNK_SIZE = 16 * 1024 # 流式解析时每次读取的响应数据大小
+
+# 关键词分析默认翻译到的目标语言，分别对应结果中的english和chinese字段
+DEFAULT_TARGET_LANGS = ('EN-US', 'ZH')
+# DeepL目标语言代码格式，如DE、FR、EN-GB、ZH-HANS
+TARGET_LANG_RE = re.compile(r'^[A-Z]{2}(?:-[A-Z]{2,4})?$')
+
+# 明显不是商品标题的内容（导航、筛选项等）
+INVALID_TITLE_PATTERNS = [
+    r'^Shop by category$',
+    r'^Daily Deals$',
+    r'^Brand Outlet$',
+    r'^Help & Contact$',
+    r'^Sell$',
+    r'^Watchlist$',
+    r'^My eBay$',
+    r'^Notification$',
+    r'^Cart$',
+    r'^Sign in$',
+    r'^Register$',
+    r'^Advanced$',
+    r'^Search$',
+    r'^Categories$',
+    r'^Motors$',
+    r'^Fashion$',
+    r'^Electronics$',
+    r'^Collectibles$',
+    r'^Home & Garden$',
+    r'^Sporting Goods$',
+    r'^Toys & Hobbies$',
+    r'^Business & Industrial$',
+    r'^Music$',
+    r'^Deals & Savings$',
+    r'^\d+$',  # 纯数字
+    r'^[^\w\s]+$',  # 只包含特殊字符
+    r'^(See all|View all|More)$',
+    r'^(Previous|Next|Page \d+)$',
+    r'^(Sort|Filter|Refine)$',
+    r'^(Buy It Now|Auction|Best Offer)$',
+    r'^(Free shipping|Fast \'N Free)$',
+    r'^(Condition|Price|Time|Distance)$',
+    r'^(New|Used|Refurbished|For parts)$',
+]
+
+# 常见的商品标题特征
+PRODUCT_INDICATOR_PATTERNS = [
+    r'\b(new|used|vintage|original|genuine|authentic|brand)\b',
+    r'\b(for|with|in|on|by|from)\b',
+    r'\b(size|color|model|type|style)\b',
+    r'\b(set|kit|pack|bundle|lot)\b',
+    r'\d+',  # 包含数字
+    r'[A-Z]{2,}',  # 包含大写字母（可能是品牌名）
+]
+
+# 合并成单个预编译正则，每个候选标题只需匹配一次
+INVALID_TITLE_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in INVALID_TITLE_PATTERNS), re.IGNORECASE)
+PRODUCT_INDICATOR_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in PRODUCT_INDICATOR_PATTERNS), re.IGNORECASE)
+
+class HostThrottle:
+    """按域名限制并发请求数，请求速率由自适应令牌桶控制（进程内共享）"""
+    def __init__(self, max_concurrency=PER_HOST_CONCURRENCY, limiter=rate_limiter):
+        self.max_concurrency = max_concurrency
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self._semaphores = {}
+    
+    def _get_semaphore(self, host):
+        """获取域名对应的信号量"""
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_concurrency)
+                self._semaphores[host] = semaphore
+            return semaphore
+    
+    @contextmanager
+    def acquire(self, url):
+        """占用一个请求名额，并等待令牌桶放行"""
+        semaphore = self._get_semaphore(urlparse(url).netloc.lower())
+        semaphore.acquire()
+        try:
+            delay = self.reserve_delay(url)
+            if delay > 0:
+                time.sleep(delay)
+            yield
+        finally:
+            semaphore.release()
+    
+    @asynccontextmanager
+    async def acquire_async(self, url):
+        """异步版本的acquire：与同步请求共享同一个域名并发上限，等待名额和令牌时不阻塞事件循环"""
+        semaphore = self._get_semaphore(urlparse(url).netloc.lower())
+        while not semaphore.acquire(blocking=False):
+            await asyncio.sleep(HOST_SLOT_POLL_INTERVAL)
+        try:
+            delay = self.reserve_delay(url)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield
+        finally:
+            semaphore.release()
+    
+    def reserve_delay(self, url):
+        """为本次请求预约一个令牌，返回需要等待的秒数"""
+        return self.limiter.reserve_delay(url)
+
+host_throttle = HostThrottle()
+
+def parse_target_langs(value):
+    """解析除英文和中文外的其他翻译目标语言（列表或逗号分隔的字符串），格式不正确时抛出ValueError"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        raise ValueError("target_langs必须是语言代码列表")
+    langs = []
+    for lang in value:
+        lang = str(lang).strip().upper()
+        if not TARGET_LANG_RE.match(lang):
+            raise ValueError(f"不支持的目标语言: {lang}")
+        if lang not in DEFAULT_TARGET_LANGS and lang not in langs:
+            langs.append(lang)
+    return langs
+
+def parse_result_count(text):
+    """从"1,234 results"/"1.234 Ergebnisse"等文本中解析结果总数"""
+    if not text:
+        return None
+    match = re.search(r'\d[\d.,\s]*', text)
+    if not match:
+        return None
+    digits = re.sub(r'\D', '', match.group(0))
+    return int(digits) if digits else None
+
+class PaginationTracker:
+    """跟踪单个搜索的分页状态，根据结果总数、下一页按钮和页面指纹判断何时停止翻页"""
+    def __init__(self, start_url, max_pages):
+        self.last_page = max_pages
+        query_params = parse_qs(urlparse(start_url).query)
+        try:
+            self.items_per_page = int(query_params.get('_ipg', [DEFAULT_ITEMS_PER_PAGE])[0])
+        except ValueError:
+            self.items_per_page = DEFAULT_ITEMS_PER_PAGE
+        self._fingerprints = {}
+    
+    def should_fetch(self, page_num):
+        return page_num <= self.last_page
+    
+    def _limit(self, last_page, reason):
+        if last_page < self.last_page:
+            self.last_page = last_page
+            logger.info(f"{reason}，最多抓取到第{last_page}页")
+    
+    def update(self, page_num, titles, page_info):
+        """记录一页的抓取结果，返回该页是否与之前的页面重复"""
+        # 抓取失败的页面不影响分页判断
+        if titles is None or page_info is None:
+            return False
+        if not titles:
+            self._limit(page_num - 1, f"第{page_num}页没有结果")
+            return False
+        
+        fingerprint = page_info['fingerprint']
+        first_page = self._fingerprints.setdefault(fingerprint, page_num)
+        if first_page < page_num:
+            self._limit(page_num - 1, f"第{page_num}页与第{first_page}页内容重复")
+            return True
+        if first_page > page_num:
+            # 页码更大的重复页先完成：当前页是原始页，页码更大的那一页超出结果范围
+            self._fingerprints[fingerprint] = page_num
+            self._limit(page_num, f"第{first_page}页与第{page_num}页内容重复")
+        
+        if page_info['has_next'] is False:
+            self._limit(page_num, f"第{page_num}页没有下一页")
+        if page_info['total_results'] is not None:
+            total_pages = max(1, math.ceil(page_info['total_results'] / self.items_per_page))
+            self._limit(total_pages, f"共{page_info['total_results']}个结果")
+        return False
+
 class TitleAnalyzer:
     def __init__(self):
-        try:
-            # 使用提供的DeepL API密钥
-            self.deepl_client = deepl.Translator("55f08e38-e61d-4259-be1f-df716be00456:fx")
-            logger.info("DeepL客户端初始化成功")
-        except Exception as e:
-            logger.error(f"DeepL客户端初始化失败: {str(e)}")
-            self.deepl_client = None
+        # 使用进程内共享的DeepL客户端（密钥由DEEPL_AUTH_KEY配置），未配置时为None
+        self.deepl_client = translator_registry.get()
         
         # 不需要翻译的词汇（品牌名、技术术语等）
         self.skip_translation = {
@@ -49,8 +252,8 @@ class TitleAnalyzer:
                 # 转换为小写
                 title_lower = title.lower()
                 
-                # 使用正则表达式提取单词（包括数字和字母的组合）
-                words = re.findall(r'\b[a-zA-Z0-9]+\b', title_lower)
+                # 使用正则表达式提取单词（包括数字和字母的组合，支持ü、é等非英文字母）
+                words = re.findall(r'\b[^\W_]+\b', title_lower)
                 
                 # 过滤掉太短的词和常见的停用词
                 stop_words = {
@@ -80,10 +283,14 @@ class TitleAnalyzer:
             logger.error(f"获取关键词失败: {str(e)}")
             return []
     
-    def batch_translate_keywords(self, keywords):
-        """使用批量翻译优化性能和准确性"""
+    def batch_translate_keywords(self, keywords, source_lang=None, extra_target_langs=()):
+        """使用批量翻译优化性能和准确性；source_lang为关键词的源语言，未指定时由DeepL自动检测
+        
+        extra_target_langs为除英文和中文外的其他目标语言（如DE、FR），其翻译放在每个关键词的translations字段中
+        """
         try:
             translated_keywords = []
+            extra_translations = {lang: {} for lang in extra_target_langs}
             
             # 分离需要翻译和不需要翻译的词汇
             need_translation = []
@@ -107,11 +314,14 @@ class TitleAnalyzer:
                 keywords_to_translate = [kw[0] for kw in need_translation]
                 
                 try:
-                    # 批量翻译到英文
-                    en_translations = self.batch_translate_text(keywords_to_translate, "EN-US")
-                    
-                    # 批量翻译到中文
-                    zh_translations = self.batch_translate_text(keywords_to_translate, "ZH")
+                    # 英文、中文和其他目标语言的翻译并发进行
+                    translations = self.batch_translate_multi(
+                        keywords_to_translate, DEFAULT_TARGET_LANGS + tuple(extra_target_langs), source_lang
+                    )
+                    en_translations = translations["EN-US"]
+                    zh_translations = translations["ZH"]
+                    for lang in extra_target_langs:
+                        extra_translations[lang] = dict(zip(keywords_to_translate, translations[lang]))
                     
                     # 组合结果
                     for i, (keyword, count) in enumerate(need_translation):
@@ -148,6 +358,14 @@ class TitleAnalyzer:
             # 按出现频率排序
             all_translated.sort(key=lambda x: x['count'], reverse=True)
             
+            # 其他目标语言中，不需要翻译或翻译失败的词汇保留原文
+            if extra_target_langs:
+                for item in all_translated:
+                    item['translations'] = {
+                        lang: extra_translations[lang].get(item['original'], item['original'])
+                        for lang in extra_target_langs
+                    }
+            
             return all_translated
             
         except Exception as e:
@@ -160,27 +378,41 @@ class TitleAnalyzer:
                 'chinese': keyword
             } for keyword, count in keywords]
     
-    def batch_translate_text(self, keywords, target_lang):
-        """批量翻译文本"""
+    def batch_translate_multi(self, keywords, target_langs, source_lang=None, timeout=TRANSLATION_TIMEOUT):
+        """并发翻译到多个目标语言，返回{目标语言: 译文列表}；超时的目标语言保留原文"""
+        target_langs = list(dict.fromkeys(target_langs))
+        executor = ThreadPoolExecutor(max_workers=max(1, len(target_langs)), thread_name_prefix='translate')
+        futures = {lang: executor.submit(self.batch_translate_text, keywords, lang, source_lang) for lang in target_langs}
+        deadline = time.monotonic() + timeout
+        results = {}
         try:
-            if not self.deepl_client:
-                logger.warning("DeepL客户端未初始化，跳过翻译")
-                return keywords
+            for lang, future in futures.items():
+                try:
+                    results[lang] = future.result(timeout=max(0, deadline - time.monotonic()))
+                except FuturesTimeoutError:
+                    logger.warning(f"翻译到{lang}超过{timeout}秒，使用原文")
+                    results[lang] = list(keywords)
+        finally:
+            # 不等待超时的翻译，它们在后台完成后仍会写入翻译缓存
+            executor.shutdown(wait=False)
+        return results
+    
+    def batch_translate_text(self, keywords, target_lang, source_lang=None):
+        """批量翻译文本，已在翻译缓存中的词不再发送给DeepL"""
+        try:
+            def translate_misses(misses):
+                if not self.deepl_client:
+                    logger.warning("DeepL客户端未初始化，跳过翻译")
+                    return None
                 
-            # 将关键词用换行符连接，便于批量翻译
-            text_to_translate = '\n'.join(keywords)
-            
-            # 调用DeepL API进行批量翻译
-            result = self.deepl_client.translate_text(text_to_translate, target_lang=target_lang)
-            
-            # 分割翻译结果
-            translations = result.text.split('\n')
+                # 与其他并发请求的未命中词合并后发送，每个关键词作为独立文本，翻译结果与关键词一一对应
+                batcher = TranslationBatcher(self.deepl_client)
+                return translation_dispatcher.translate(
+                    misses, target_lang, lambda terms: batcher.translate(terms, target_lang, source_lang), source_lang
+                )
             
-            # 确保翻译结果数量与输入一致
-            while len(translations) < len(keywords):
-                translations.append(keywords[len(translations)])
-            
-            return translations[:len(keywords)]
+            # 未翻译到的词保留原文，确保翻译结果数量与输入一致
+            return translation_cache.translate(keywords, target_lang, translate_misses, source_lang)
             
         except Exception as e:
             logger.error(f"批量翻译到{target_lang}失败: {str(e)}")
@@ -235,7 +467,7 @@ class TitleAnalyzer:
             logger.error(f"获取中文映射失败: {str(e)}")
             return keyword
     
-    def analyze_titles(self, titles):
+    def analyze_titles(self, titles, top_n=50, extra_target_langs=()):
         """完整的标题分析流程"""
         try:
             if not titles:
@@ -252,12 +484,12 @@ class TitleAnalyzer:
             words = self.tokenize_titles(titles)
             
             # 获取高频关键词
-            top_keywords = self.get_top_keywords(words, 50)
+            top_keywords = self.get_top_keywords(words, top_n)
             
             logger.info(f"找到{len(top_keywords)}个高频关键词，开始批量翻译")
             
             # 批量翻译关键词
-            translated_keywords = self.batch_translate_keywords(top_keywords)
+            translated_keywords = self.batch_translate_keywords(top_keywords, extra_target_langs=extra_target_langs)
             
             # 计算每个关键词的占比
             total_word_count = sum(item['count'] for item in translated_keywords)
@@ -282,80 +514,182 @@ class TitleAnalyzer:
                 'top_keywords': [],
                 'error': str(e)
             }
+    
+    def analyze_title_groups(self, title_groups, languages=None, top_n=50, extra_target_langs=()):
+        """分别分析多组标题（如各站点的标题），同一源语言的关键词合并后只翻译一次
+        
+        title_groups为{组名: 标题列表}，languages为{组名: DeepL源语言代码}，未指定的组由DeepL自动检测语言
+        """
+        languages = languages or {}
+        try:
+            # 先完成各组的分词和词频统计
+            group_keywords = {}
+            keywords_by_language = {}
+            for name, titles in title_groups.items():
+                words = self.tokenize_titles(titles or [])
+                top_keywords = self.get_top_keywords(words, top_n)
+                group_keywords[name] = (words, top_keywords)
+                merged = keywords_by_language.setdefault(languages.get(name), Counter())
+                for keyword, count in top_keywords:
+                    merged[keyword] += count
+            
+            # 每种源语言的关键词去重后批量翻译一次，各组共享翻译结果
+            translations = {}
+            for source_lang, merged in keywords_by_language.items():
+                if not merged:
+                    continue
+                logger.info(f"批量翻译{len(merged)}个{source_lang or '自动检测语言'}关键词")
+                for item in self.batch_translate_keywords(merged.most_common(), source_lang, extra_target_langs):
+                    translations[(source_lang, item['original'])] = item
+            
+            results = {}
+            for name, (words, top_keywords) in group_keywords.items():
+                source_lang = languages.get(name)
+                total_word_count = sum(count for _, count in top_keywords)
+                translated_keywords = []
+                for keyword, count in top_keywords:
+                    item = translations.get((source_lang, keyword)) or {'english': keyword, 'chinese': keyword}
+                    keyword_result = {
+                        'original': keyword,
+                        'count': count,
+                        'english': item['english'],
+                        'chinese': item['chinese'],
+                        'percentage': round((count / total_word_count) * 100, 2) if total_word_count > 0 else 0
+                    }
+                    if extra_target_langs:
+                        keyword_result['translations'] = item.get('translations') or dict.fromkeys(extra_target_langs, keyword)
+                    translated_keywords.append(keyword_result)
+                
+                results[name] = {
+                    'total_titles': len(title_groups[name] or []),
+                    'total_words': len(words),
+                    'unique_words': len(set(words)),
+                    'top_keywords': translated_keywords
+                }
+            
+            return results
+        
+        except Exception as e:
+            logger.error(f"分组标题分析失败: {str(e)}")
+            return {
+                name: {
+                    'total_titles': len(titles) if titles else 0,
+                    'total_words': 0,
+                    'unique_words': 0,
+                    'top_keywords': [],
+                    'error': str(e)
+                }
+                for name, titles in title_groups.items()
+            }
 
 class EbayScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Accept-Language': 'en-US,en;q=0.9,zh-CN;q=0.8,zh;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Cache-Control': 'max-age=0'
-        })
+    def __init__(self, session=None, bypass_cache=False, parser=None, streaming=False, records=False):
+        # 默认从进程内共享的连接池借用Session，复用keep-alive连接
+        self.session = session or get_http_pool().session
+        # bypass_cache为True时不读取页面缓存，但仍会用新抓取的页面刷新缓存
+        self.bypass_cache = bypass_cache
+        # HTML解析后端：lxml（默认）或html.parser
+        self.parser_backend = get_parser_backend(parser)
+        # 流式解析：边下载边解析，结果列表结束后停止下载（需要lxml后端）
+        self.streaming = streaming and self.parser_backend.name == 'lxml'
+        if streaming and not self.streaming:
+            logger.warning("流式解析需要lxml解析后端，已改为完整下载后解析")
+        # records为True时每页返回ListingRecord商品记录，而不是标题字符串
+        self.records = records
         
     def extract_titles_from_page(self, html_content):
         """从页面HTML中提取商品标题"""
+        return [title for title, _ in self.extract_titles_with_sources(html_content)]
+    
+    def extract_titles_with_sources(self, html_content):
+        """一次遍历页面提取商品标题，返回(标题, 命中的策略名)列表"""
+        try:
+            return self._extract_from_document(self.parser_backend.parse(html_content))
+        except Exception as e:
+            logger.error(f"提取标题失败: {str(e)}")
+            return []
+    
+    def extract_page(self, html_content):
+        """解析页面，返回(标题列表, 分页信息)，页面只解析一次"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            titles = []
+            return self._extract_page_document(self.parser_backend.parse(html_content))
+        except Exception as e:
+            logger.error(f"解析页面失败: {str(e)}")
+            return [], {'total_results': None, 'has_next': None, 'fingerprint': None, 'item_ids': []}
+    
+    def _extract_page_document(self, document):
+        """从已解析的文档中提取(标题或商品记录列表, 分页信息)"""
+        try:
+            backend = self.parser_backend
+            entries = self._extract_entries(document)
+            titles = [title for title, _, _ in entries]
             
-            # 选择器策略列表，按优先级排序
-            selectors = [
-                # 主要选择器：h3标签中带有textual-display bsig__title__text类的元素
-                {'selector': 'h3', 'class_filter': lambda x: x and ('textual-display' in x and 'bsig__title__text' in x), 'name': 'primary'},
-                
-                # 备用选择器1：h3标签中带有s-item__title类的元素
-                {'selector': 'h3', 'class_filter': lambda x: x and 's-item__title' in x, 'name': 'backup1'},
-                
-                # 备用选择器2：span标签中role="heading"的元素
-                {'selector': 'span', 'attrs': {'role': 'heading'}, 'name': 'backup2'},
-                
-                # 备用选择器3：h3标签中包含item title相关类的元素
-                {'selector': 'h3', 'class_filter': lambda x: x and ('item' in x.lower() and 'title' in x.lower()), 'name': 'backup3'},
-                
-                # 备用选择器4：a标签指向商品详情页（/itm/）
-                {'selector': 'a', 'href_filter': lambda x: x and '/itm/' in x, 'name': 'backup4'},
-                
-                # 备用选择器5：通用标题选择器
-                {'selector': 'h3', 'class_filter': lambda x: x and any(keyword in x.lower() for keyword in ['title', 'name', 'product']), 'name': 'backup5'}
-            ]
+            count_text, has_next = backend.get_pagination_info(document)
+            page_info = {
+                'total_results': parse_result_count(count_text),
+                'has_next': has_next,
+                # 页面指纹：用于识别eBay对超出范围的页码重复返回最后一页
+                'fingerprint': hashlib.sha1('\n'.join(titles).encode('utf-8')).hexdigest()
+            }
+            if self.records:
+                # 在同一棵文档树上从标题所在的商品卡片提取价格、运费等字段
+                listings = [
+                    build_listing(title, backend.iter_listing_nodes(element)) for title, _, element in entries
+                ]
+                page_info['item_ids'] = [listing.item_id for listing in listings]
+                return listings, page_info
             
-            for selector_config in selectors:
-                try:
-                    if 'class_filter' in selector_config:
-                        elements = soup.find_all(selector_config['selector'], class_=selector_config['class_filter'])
-                    elif 'attrs' in selector_config:
-                        elements = soup.find_all(selector_config['selector'], attrs=selector_config['attrs'])
-                    elif 'href_filter' in selector_config:
-                        elements = soup.find_all(selector_config['selector'], href=selector_config['href_filter'])
-                    else:
+            # 商品ID用于跨页去重，与标题列表一一对应，解析不到时为None
+            page_info['item_ids'] = [parse_item_id(backend.get_item_link(element)) for _, _, element in entries]
+            return titles, page_info
+        
+        except Exception as e:
+            logger.error(f"解析页面失败: {str(e)}")
+            return [], {'total_results': None, 'has_next': None, 'fingerprint': None, 'item_ids': []}
+    
+    def _extract_from_document(self, document):
+        """从已解析的文档中提取商品标题，返回(标题, 命中的策略名)列表"""
+        return [(title, strategy_name) for title, strategy_name, _ in self._extract_entries(document)]
+    
+    def _extract_entries(self, document):
+        """从已解析的文档中提取商品标题，返回(标题, 命中的策略名, 元素)列表"""
+        try:
+            backend = self.parser_backend
+            
+            # 单次遍历文档，把每个元素分配给它命中的所有策略
+            candidates = [[] for _ in TITLE_STRATEGIES]
+            for element, matched in backend.iter_candidates(document):
+                for index in matched:
+                    candidates[index].append(element)
+            
+            # 按策略优先级合并，集合去重并保持顺序；元素文本只在用到时提取一次
+            results = []
+            seen = set()
+            texts = {}
+            validity = {}
+            for strategy, elements in zip(TITLE_STRATEGIES, candidates):
+                found_count = 0
+                for element in elements:
+                    title = texts.get(id(element))
+                    if title is None:
+                        title = texts[id(element)] = backend.get_text(element)
+                    if title in seen:
                         continue
-                    
-                    found_count = 0
-                    for element in elements:
-                        title = element.get_text(strip=True)
-                        if self.is_valid_title(title) and title not in titles:
-                            titles.append(title)
-                            found_count += 1
-                    
-                    logger.info(f"选择器 {selector_config['name']} 找到 {found_count} 个有效标题")
-                    
-                    # 如果找到足够多的标题，就停止尝试其他选择器
-                    if len(titles) >= 20:
-                        break
-                        
-                except Exception as e:
-                    logger.warning(f"选择器 {selector_config['name']} 执行失败: {str(e)}")
-                    continue
+                    is_valid = validity.get(title)
+                    if is_valid is None:
+                        is_valid = validity[title] = self.is_valid_title(title)
+                    if is_valid:
+                        seen.add(title)
+                        results.append((title, strategy['name'], element))
+                        found_count += 1
+                
+                logger.info(f"选择器 {strategy['name']} 找到 {found_count} 个有效标题")
+                
+                # 如果找到足够多的标题，就停止尝试其他选择器
+                if len(results) >= 20:
+                    break
             
-            return titles
+            return results
             
         except Exception as e:
             logger.error(f"提取标题失败: {str(e)}")
@@ -372,61 +706,13 @@ class EbayScraper:
                 return False
             
             # 过滤掉一些明显不是商品标题的内容
-            invalid_patterns = [
-                r'^Shop by category$',
-                r'^Daily Deals$',
-                r'^Brand Outlet$',
-                r'^Help & Contact$',
-                r'^Sell$',
-                r'^Watchlist$',
-                r'^My eBay$',
-                r'^Notification$',
-                r'^Cart$',
-                r'^Sign in$',
-                r'^Register$',
-                r'^Advanced$',
-                r'^Search$',
-                r'^Categories$',
-                r'^Motors$',
-                r'^Fashion$',
-                r'^Electronics$',
-                r'^Collectibles$',
-                r'^Home & Garden$',
-                r'^Sporting Goods$',
-                r'^Toys & Hobbies$',
-                r'^Business & Industrial$',
-                r'^Music$',
-                r'^Deals & Savings$',
-                r'^\d+$',  # 纯数字
-                r'^[^\w\s]+$',  # 只包含特殊字符
-                r'^(See all|View all|More)$',
-                r'^(Previous|Next|Page \d+)$',
-                r'^(Sort|Filter|Refine)$',
-                r'^(Buy It Now|Auction|Best Offer)$',
-                r'^(Free shipping|Fast \'N Free)$',
-                r'^(Condition|Price|Time|Distance)$',
-                r'^(New|Used|Refurbished|For parts)$',
-            ]
-            
-            for pattern in invalid_patterns:
-                if re.match(pattern, title, re.IGNORECASE):
-                    return False
+            if INVALID_TITLE_RE.match(title):
+                return False
             
             # 检查是否包含常见的商品标题特征
             # 如果标题太短且不包含这些特征，可能不是商品标题
-            if len(title) < 15:
-                product_indicators = [
-                    r'\b(new|used|vintage|original|genuine|authentic|brand)\b',
-                    r'\b(for|with|in|on|by|from)\b',
-                    r'\b(size|color|model|type|style)\b',
-                    r'\b(set|kit|pack|bundle|lot)\b',
-                    r'\d+',  # 包含数字
-                    r'[A-Z]{2,}',  # 包含大写字母（可能是品牌名）
-                ]
-                
-                has_indicator = any(re.search(pattern, title, re.IGNORECASE) for pattern in product_indicators)
-                if not has_indicator:
-                    return False
+            if len(title) < 15 and not PRODUCT_INDICATOR_RE.search(title):
+                return False
             
             return True
             
@@ -434,6 +720,27 @@ class EbayScraper:
             logger.error(f"标题验证失败: {str(e)}")
             return False
     
+    def dedupe(self, items, item_ids=None, seen=None):
+        """按商品ID去重并保持顺序，解析不到商品ID的按标题去重
+        
+        seen为SeenItemSet时跨页/跨抓取共享，已在其中的商品会被跳过，新商品会加入其中
+        """
+        return self.dedupe_with_ids(items, item_ids, seen)[0]
+    
+    def dedupe_with_ids(self, items, item_ids=None, seen=None):
+        """与dedupe相同，同时返回保留下来的商品对应的商品ID，即(商品列表, 商品ID列表)"""
+        if seen is None:
+            seen = SeenItemSet()
+        if item_ids is None:
+            item_ids = [None] * len(items)
+        unique = []
+        unique_ids = []
+        for item, item_id in zip(items, item_ids):
+            if seen.add(item_key(item_id, item.title if self.records else item)):
+                unique.append(item)
+                unique_ids.append(item_id)
+        return unique, unique_ids
+    
     def get_next_page_url(self, current_url, page_num):
         """生成下一页的URL"""
         try:
@@ -459,67 +766,391 @@ class EbayScraper:
             logger.error(f"生成下一页URL失败: {str(e)}")
             return None
     
-    def scrape_page_with_retry(self, url, max_retries=3):
-        """带重试机制的页面抓取"""
+    def scrape_page_with_retry(self, url, max_retries=3, stream=False):
+        """带重试机制的页面抓取，响应结果会反馈给自适应限速器和熔断器
+        
+        stream为True时返回尚未读取响应体的response，由调用方负责读取和关闭
+        """
         for attempt in range(max_retries):
+            # 域名熔断时直接失败，不再重试
+            circuit_breaker.before_request(url)
             try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
+                if attempt > 0:
+                    # 重试同样需要令牌，并且至少等待一个带抖动的退避时间
+                    delay = max(rate_limiter.backoff_delay(attempt - 1), rate_limiter.reserve_delay(url))
+                    time.sleep(delay)
                 
-                # 检查是否被重定向到错误页面
-                if 'error' in response.url.lower() or 'blocked' in response.url.lower():
-                    raise requests.RequestException("可能被反爬虫机制阻断")
+                started = time.monotonic()
+                try:
+                    response = self.session.get(url, timeout=30, stream=stream)
+                except requests.RequestException:
+                    rate_limiter.record_response(url)
+                    circuit_breaker.record_failure(url)
+                    raise
+                try:
+                    rate_limiter.record_response(
+                        url,
+                        response.status_code,
+                        time.monotonic() - started,
+                        parse_retry_after(response.headers.get('Retry-After'))
+                    )
+                    
+                    # 检查是否被重定向到错误页面
+                    blocked = 'error' in response.url.lower() or 'blocked' in response.url.lower()
+                    circuit_breaker.record_response(url, response.status_code, blocked)
+                    response.raise_for_status()
+                    
+                    if blocked:
+                        rate_limiter.record_response(url)
+                        raise requests.RequestException("可能被反爬虫机制阻断")
+                except Exception:
+                    # 流式响应的连接在读取或关闭前不会归还连接池，出错重试前必须先关闭
+                    if stream:
+                        response.close()
+                    raise
                 
-                return response.text
+                return response if stream else response.text
                 
             except requests.RequestException as e:
                 logger.warning(f"第{attempt + 1}次尝试抓取失败: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # 指数退避
-                else:
+                if attempt >= max_retries - 1:
                     raise e
     
-    def scrape_titles(self, start_url, max_pages=4):
-        """抓取商品标题"""
+    def build_page_urls(self, start_url, max_pages):
+        """生成需要抓取的各页URL，返回(页码, URL)列表"""
+        page_urls = []
+        for page_num in range(1, max_pages + 1):
+            if page_num == 1:
+                url = start_url
+            else:
+                url = self.get_next_page_url(start_url, page_num)
+                if not url:
+                    logger.error(f"无法生成第{page_num}页的URL")
+                    continue
+            page_urls.append((page_num, url))
+        return page_urls
+    
+    def fetch_page(self, url):
+        """获取页面HTML，优先读取页面缓存，返回(HTML, 是否命中缓存)
+        
+        新下载的页面不在这里缓存，由调用方解析出标题后调用cache_page
+        """
+        page_cache = get_page_cache()
+        if not self.bypass_cache:
+            html_content = page_cache.get(url)
+            if html_content is not None:
+                logger.info(f"页面缓存命中: {url}")
+                return html_content, True
+        
+        # 熔断时不必排队等待令牌，立即失败
+        circuit_breaker.raise_if_open(url)
+        with host_throttle.acquire(url):
+            html_content = self.scrape_page_with_retry(url)
+        return html_content, False
+    
+    def cache_page(self, url, html_content, titles):
+        """只缓存解析出标题的页面，避免验证码或拦截页在缓存有效期内被当作没有结果的页面"""
+        if titles:
+            get_page_cache().set(url, html_content)
+        else:
+            logger.info(f"页面未解析出标题，不写入缓存: {url}")
+    
+    def stream_page(self, url):
+        """流式下载并解析页面，结果列表解析完后立即停止下载，返回(标题列表, 分页信息)"""
+        page_cache = get_page_cache()
+        if not self.bypass_cache:
+            html_content = page_cache.get(url)
+            if html_content is not None:
+                logger.info(f"页面缓存命中: {url}")
+                return self.extract_page(html_content)
+        
+        circuit_breaker.raise_if_open(url)
+        with host_throttle.acquire(url):
+            response = self.scrape_page_with_retry(url, stream=True)
+            chunks = []
+            try:
+                stream_parser = StreamingPageParser(encoding=response.encoding)
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    chunks.append(chunk)
+                    stream_parser.feed(chunk)
+                    if stream_parser.finished:
+                        logger.info(f"结果列表已解析完，停止下载，已读取{stream_parser.bytes_fed}字节")
+                        break
+                document = stream_parser.close()
+            finally:
+                # 提前停止、读取失败或解析出错时都关闭连接，丢弃未读取的响应数据并归还连接池
+                response.close()
+        
+        titles, page_info = self._extract_page_document(document)
+        # 缓存已读取的部分，其中包含提取所需的全部内容
+        self.cache_page(url, b''.join(chunks).decode(response.encoding or 'utf-8', errors='replace'), titles)
+        return titles, page_info
+    
+    def scrape_page(self, page_num, url):
+        """抓取并解析单个页面，返回(标题列表, 分页信息)，失败时均为None"""
         try:
-            all_titles = []
-            successful_pages = 0
+            logger.info(f"正在抓取第{page_num}页: {url}")
             
-            for page_num in range(1, max_pages + 1):
-                try:
-                    if page_num == 1:
-                        url = start_url
-                    else:
-                        url = self.get_next_page_url(start_url, page_num)
-                        if not url:
-                            logger.error(f"无法生成第{page_num}页的URL")
-                            continue
-                    
-                    logger.info(f"正在抓取第{page_num}页: {url}")
-                    
-                    html_content = self.scrape_page_with_retry(url)
-                    titles = self.extract_titles_from_page(html_content)
+            if self.streaming:
+                titles, page_info = self.stream_page(url)
+            else:
+                html_content, from_cache = self.fetch_page(url)
+                titles, page_info = self.extract_page(html_content)
+                if not from_cache:
+                    self.cache_page(url, html_content, titles)
+            
+            if titles:
+                logger.info(f"第{page_num}页找到{len(titles)}个标题")
+            else:
+                logger.warning(f"第{page_num}页未找到任何标题")
+            return titles, page_info
+            
+        except requests.RequestException as e:
+            logger.error(f"抓取第{page_num}页时发生网络错误: {str(e)}")
+            return None, None
+        except Exception as e:
+            logger.error(f"处理第{page_num}页时发生未知错误: {str(e)}")
+            return None, None
+    
+    def iter_page_titles(self, start_url, max_pages=4, concurrency=1, skip_pages=None):
+        """逐页抓取商品标题，每完成一页就返回(页码, 标题列表, 商品ID列表)，失败的页面后两项为None
+        
+        concurrency大于1时使用线程池并发抓取，页码更小的页面都完成后才返回该页，以便排除超出结果范围的页面；
+        skip_pages中的页码（如恢复中断的任务时已完成的页面）不会再抓取；
+        结果翻完、页面为空或与之前的页面重复时提前停止
+        """
+        skip_pages = set(skip_pages or ())
+        if concurrency > 1:
+            yield from self._iter_page_titles_concurrent(start_url, max_pages, concurrency, skip_pages)
+            return
+        
+        tracker = PaginationTracker(start_url, max_pages)
+        for page_num in range(1, max_pages + 1):
+            if page_num in skip_pages:
+                continue
+            if not tracker.should_fetch(page_num):
+                break
+            
+            if page_num == 1:
+                url = start_url
+            else:
+                url = self.get_next_page_url(start_url, page_num)
+                if not url:
+                    logger.error(f"无法生成第{page_num}页的URL")
+                    continue
+                
+            titles, page_info = self.scrape_page(page_num, url)
+            if tracker.update(page_num, titles, page_info):
+                break
+            yield page_num, titles, page_info and page_info['item_ids']
+    
+    def _iter_page_titles_concurrent(self, start_url, max_pages, concurrency, skip_pages=()):
+        """使用线程池并发抓取多个页面，按页码顺序返回结果
+        
+        超出结果范围的页面可能先于它重复的原始页完成，此时还无法识别；因此每页要等页码更小的页面都完成后，
+        再按最终确定的结果范围检查并返回
+        """
+        page_urls = [
+            (page_num, url) for page_num, url in self.build_page_urls(start_url, max_pages)
+            if page_num not in skip_pages
+        ]
+        if not page_urls:
+            return
+        
+        tracker = PaginationTracker(start_url, max_pages)
+        
+        # 先单独抓取第1页，根据结果总数和分页信息确定实际需要抓取的页数
+        if page_urls[0][0] == 1:
+            page_num, url = page_urls.pop(0)
+            titles, page_info = self.scrape_page(page_num, url)
+            tracker.update(page_num, titles, page_info)
+            yield page_num, titles, page_info and page_info['item_ids']
+        
+        page_urls = [(page_num, url) for page_num, url in page_urls if tracker.should_fetch(page_num)]
+        if not page_urls:
+            return
+        
+        workers = max(1, min(concurrency, MAX_PAGE_CONCURRENCY, len(page_urls)))
+        logger.info(f"并发抓取{len(page_urls)}页，并发数{workers}")
+        
+        # 域名级别的并发上限和请求间隔由host_throttle统一控制
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                executor.submit(self.scrape_page, page_num, url): page_num
+                for page_num, url in page_urls
+            }
+            # 尚未返回的页码（升序），以及已完成但在等待更小页码的页面结果（重复页和已取消的页面为None）
+            unreturned = [page_num for page_num, _ in page_urls]
+            finished = {}
+            for future in as_completed(futures):
+                page_num = futures[future]
+                finished[page_num] = None
+                if not future.cancelled():
+                    titles, page_info = future.result()
+                    if not tracker.update(page_num, titles, page_info):
+                        finished[page_num] = (titles, page_info and page_info['item_ids'])
                     
-                    if titles:
-                        logger.info(f"第{page_num}页找到{len(titles)}个标题")
+                    # 已确定超出结果范围的页面不再抓取
+                    for pending_future, pending_page in futures.items():
+                        if not tracker.should_fetch(pending_page):
+                            pending_future.cancel()
+                
+                while unreturned and unreturned[0] in finished:
+                    ready_page = unreturned.pop(0)
+                    result = finished.pop(ready_page)
+                    if result is not None and tracker.should_fetch(ready_page):
+                        yield (ready_page,) + result
+        finally:
+            # 调用方提前停止迭代（如客户端断开）时取消尚未开始的页面
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def scrape_batch(self, searches, concurrency=4):
+        """批量抓取多个搜索URL，所有页面共享同一个线程池
+        
+        每个搜索先抓取第1页，根据结果总数和分页信息确定实际页数后再提交其余页面；
+        searches为(URL, 最大页数)列表，返回与之顺序一致的(标题列表, 商品ID列表, 成功页数)列表，每个搜索内按商品ID去重
+        """
+        try:
+            page_urls_by_search = [self.build_page_urls(url, max_pages) for url, max_pages in searches]
+            total_pages = sum(len(page_urls) for page_urls in page_urls_by_search)
+            if not total_pages:
+                return [([], [], 0) for _ in searches]
+            
+            workers = max(1, min(concurrency, MAX_PAGE_CONCURRENCY, total_pages))
+            logger.info(f"批量抓取{len(searches)}个搜索，最多{total_pages}页，并发数{workers}")
+            
+            # 域名级别的并发上限和请求间隔由host_throttle统一控制
+            trackers = [PaginationTracker(url, max_pages) for url, max_pages in searches]
+            page_results = [{} for _ in searches]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {}
+                
+                def submit(search_index, page_num, url):
+                    future = executor.submit(self.scrape_page, page_num, url)
+                    futures[future] = (search_index, page_num)
+                    return future
+                
+                # 所有搜索的第1页最先开始
+                pending = {
+                    submit(search_index, *page_urls[0])
+                    for search_index, page_urls in enumerate(page_urls_by_search) if page_urls
+                }
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future.cancelled():
+                            continue
+                        search_index, page_num = futures[future]
+                        titles, page_info = future.result()
+                        tracker = trackers[search_index]
+                        if not tracker.update(page_num, titles, page_info):
+                            page_results[search_index][page_num] = (titles, page_info and page_info['item_ids'])
+                        
+                        page_urls = page_urls_by_search[search_index]
+                        if page_num == page_urls[0][0]:
+                            # 第1页完成后，只提交该搜索在结果范围内的其余页面
+                            pending.update(
+                                submit(search_index, next_page, url)
+                                for next_page, url in page_urls[1:] if tracker.should_fetch(next_page)
+                            )
+                        
+                        # 该搜索已确定超出结果范围的页面不再抓取
+                        for pending_future, (pending_search, pending_page) in futures.items():
+                            if pending_search == search_index and not tracker.should_fetch(pending_page):
+                                pending_future.cancel()
+            
+            results = []
+            for pages, tracker in zip(page_results, trackers):
+                all_titles = []
+                all_item_ids = []
+                successful_pages = 0
+                for page_num in sorted(pages):
+                    titles, item_ids = pages[page_num]
+                    # 乱序完成时，超出结果范围的页面可能先于原始页完成而未被识别为重复页
+                    if titles and tracker.should_fetch(page_num):
                         all_titles.extend(titles)
+                        all_item_ids.extend(item_ids)
                         successful_pages += 1
-                    else:
-                        logger.warning(f"第{page_num}页未找到任何标题")
-                    
-                    # 添加延迟以避免被反爬虫机制阻断
-                    if page_num < max_pages:
-                        time.sleep(2)
-                        
-                except requests.RequestException as e:
-                    logger.error(f"抓取第{page_num}页时发生网络错误: {str(e)}")
-                    continue
-                except Exception as e:
-                    logger.error(f"处理第{page_num}页时发生未知错误: {str(e)}")
+                results.append(self.dedupe_with_ids(all_titles, all_item_ids) + (successful_pages,))
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"批量抓取过程失败: {str(e)}")
+            return [([], [], 0) for _ in searches]
+    
+    def scrape_incremental(self, start_url, max_pages, seen, on_page=None):
+        """增量抓取：返回(新商品列表, 标题有变化的商品列表, 成功页数)，并把本次抓取到的商品记入seen
+        
+        按"最新刊登"排序（_sop=10）时新商品总在前面，遇到整页都已抓取过的页面就停止翻页；
+        其他排序方式下会抓取全部页面；on_page在每页完成时以(页码, 标题列表, 商品ID列表)调用；
+        页面缓存中的旧页面会被误判为没有新商品，调用方应使用bypass_cache=True创建爬虫
+        """
+        newest_first = parse_qs(urlparse(start_url).query).get('_sop') == ['10']
+        new_items = []
+        changed_items = []
+        successful_pages = 0
+        run_keys = set()
+        
+        page_iter = self.iter_page_titles(start_url, max_pages)
+        try:
+            for page_num, titles, item_ids in page_iter:
+                if on_page:
+                    on_page(page_num, titles, item_ids)
+                if not titles:
                     continue
+                successful_pages += 1
+                
+                page_new = 0
+                for item, item_id in zip(titles, item_ids):
+                    title = item.title if self.records else item
+                    key = item_key(item_id, title)
+                    # 同一次抓取中重复出现的商品（如每页都有的广告商品）只处理一次
+                    if key in run_keys:
+                        continue
+                    run_keys.add(key)
+                    
+                    status = seen.update(key, title_hash(title))
+                    if status == 'new':
+                        new_items.append(item)
+                        page_new += 1
+                    elif status == 'changed':
+                        changed_items.append(item)
+                
+                if newest_first and page_new == 0:
+                    logger.info(f"第{page_num}页的商品都已抓取过，停止翻页")
+                    break
+        finally:
+            page_iter.close()
+        
+        logger.info(f"增量抓取完成：新商品{len(new_items)}个，标题有变化{len(changed_items)}个，抓取{successful_pages}页")
+        return new_items, changed_items, successful_pages
+    
+    def scrape_titles(self, start_url, max_pages=4, concurrency=1, seen=None, on_page=None):
+        """抓取商品标题，结果按页码顺序返回并按商品ID去重；seen中已有的商品会被跳过
+        
+        on_page在每页完成时以(页码, 标题列表, 商品ID列表)调用，调用发生在当前线程
+        """
+        try:
+            page_results = []
+            for result in self.iter_page_titles(start_url, max_pages, concurrency):
+                if on_page:
+                    on_page(*result)
+                page_results.append(result)
+            page_results.sort(key=lambda result: result[0])
+            
+            all_titles = []
+            all_item_ids = []
+            successful_pages = 0
+            for page_num, titles, item_ids in page_results:
+                if titles:
+                    all_titles.extend(titles)
+                    all_item_ids.extend(item_ids)
+                    successful_pages += 1
             
             # 去重
-            unique_titles = list(dict.fromkeys(all_titles))
+            unique_titles = self.dedupe(all_titles, all_item_ids, seen)
             logger.info(f"总共抓取到{len(unique_titles)}个唯一标题，成功抓取{successful_pages}页")
             
             return unique_titles, successful_pages
@@ -543,28 +1174,388 @@ def scrape_ebay():
         if not parsed_url.netloc or 'ebay' not in parsed_url.netloc.lower():
             return jsonify({'error': '请提供有效的eBay页面URL'}), 400
         
+        # 抓取页数和页面并发数（可选参数）
+        try:
+            max_pages = int(data.get('max_pages', 4))
+            concurrency = int(data.get('concurrency', 1))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'max_pages和concurrency必须是整数'}), 400
+        max_pages = max(1, min(max_pages, MAX_PAGES_LIMIT))
+        concurrency = max(1, min(concurrency, MAX_PAGE_CONCURRENCY))
+        bypass_cache = bool(data.get('bypass_cache', False))
+        streaming = bool(data.get('streaming', False))
+        # records为True时返回包含价格、运费等字段的商品记录，而不是标题字符串
+        records = bool(data.get('records', False))
+        # skip_seen为True时跳过该搜索之前抓取过的商品（按商品ID），并记住本次抓取到的商品
+        skip_seen = bool(data.get('skip_seen', False))
+        # incremental为True时只返回该搜索上次抓取之后新出现或标题有变化的商品，遇到整页都已抓取过时停止翻页
+        incremental = bool(data.get('incremental', False))
+        # store为False时不把本次抓取的页面和商品保存到数据库
+        store = bool(data.get('store', True))
+        # 跳过已抓取商品和增量抓取需要最新的页面：缓存中的旧页面只包含已抓取过的商品，会被误判为没有新商品
+        if skip_seen or incremental:
+            bypass_cache = True
+        
+        # background为True时放入后台任务队列，立即返回任务ID
+        if data.get('background'):
+            if records or skip_seen or incremental:
+                return jsonify({'error': '后台任务不支持records、skip_seen和incremental参数'}), 400
+            from src.routes.jobs import job_manager
+            job = job_manager.enqueue(url, max_pages=max_pages, concurrency=concurrency, bypass_cache=bypass_cache)
+            return jsonify({
+                'success': True,
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': f'/api/jobs/{job.id}',
+                'message': '抓取任务已加入队列'
+            }), 202
+        
         # 创建爬虫实例并开始抓取
-        scraper = EbayScraper()
-        titles, successful_pages = scraper.scrape_titles(url)
+        scraper = EbayScraper(bypass_cache=bypass_cache, streaming=streaming, records=records)
+        seen = SearchSeenItems.load(url) if skip_seen or incremental else None
         
-        if not titles:
+        # 每抓取完一页就把该页的全部商品保存到数据库（保存的是去重前的原始结果）
+        run = None
+        if store:
+            mode = 'incremental' if incremental else ('skip_seen' if skip_seen else 'scrape')
+            run = ScrapeRun.start(url, mode=mode, max_pages=max_pages)
+        
+        def store_page(page_num, items, item_ids):
+            try:
+                run.add_page(page_num, items, item_ids)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"保存第{page_num}页抓取结果失败: {str(e)}")
+        
+        on_page = store_page if run else None
+        if incremental:
+            new_items, changed_items, successful_pages = scraper.scrape_incremental(url, max_pages, seen, on_page)
+            titles = new_items + changed_items
+        else:
+            titles, successful_pages = scraper.scrape_titles(
+                url, max_pages=max_pages, concurrency=concurrency, seen=seen, on_page=on_page
+            )
+        if run:
+            run.finish('completed' if successful_pages else 'failed')
+        
+        # 跳过已抓取商品时，页面抓取成功但没有新商品不算失败
+        if not titles and not (seen is not None and successful_pages):
             return jsonify({
                 'error': '未能抓取到任何商品标题，请检查URL是否正确或稍后重试',
                 'successful_pages': successful_pages
             }), 404
         
-        return jsonify({
+        result = {
             'success': True,
-            'titles': titles,
             'count': len(titles),
-            'successful_pages': successful_pages,
-            'message': f'成功抓取{successful_pages}页，共获得{len(titles)}个商品标题'
+            'successful_pages': successful_pages
+        }
+        if records:
+            result['listings'] = [listing.to_dict() for listing in titles]
+            result['message'] = f'成功抓取{successful_pages}页，共获得{len(titles)}条商品记录'
+        else:
+            result['titles'] = titles
+            result['message'] = f'成功抓取{successful_pages}页，共获得{len(titles)}个商品标题'
+        if incremental:
+            result['new_count'] = len(new_items)
+            result['changed_count'] = len(changed_items)
+        if seen is not None:
+            SearchSeenItems.save(url, seen)
+            result['seen_total'] = len(seen)
+        if run:
+            result['run_id'] = run.id
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"抓取过程中发生错误: {str(e)}")
+        return jsonify({'error': f'抓取失败: {str(e)}'}), 500
+
+@scraper_bp.route('/scrape-batch', methods=['POST'])
+def scrape_ebay_batch():
+    """批量抓取多个eBay搜索URL，返回按URL分组的标题和合并去重后的标题"""
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('searches'), list) or not data['searches']:
+            return jsonify({'error': '请提供要抓取的搜索列表'}), 400
+        
+        if len(data['searches']) > MAX_BATCH_URLS:
+            return jsonify({'error': f'单次最多批量抓取{MAX_BATCH_URLS}个URL'}), 400
+        
+        searches = []
+        for index, search in enumerate(data['searches']):
+            # 每一项可以是URL字符串，或包含url和max_pages的对象
+            if isinstance(search, str):
+                search = {'url': search}
+            if not isinstance(search, dict) or not search.get('url'):
+                return jsonify({'error': f'第{index + 1}项缺少URL'}), 400
+            
+            url = str(search['url']).strip()
+            parsed_url = urlparse(url)
+            if not parsed_url.netloc or 'ebay' not in parsed_url.netloc.lower():
+                return jsonify({'error': f'第{index + 1}项不是有效的eBay页面URL'}), 400
+            
+            try:
+                max_pages = int(search.get('max_pages', 4))
+            except (TypeError, ValueError):
+                return jsonify({'error': f'第{index + 1}项的max_pages必须是整数'}), 400
+            searches.append((url, max(1, min(max_pages, MAX_PAGES_LIMIT))))
+        
+        try:
+            concurrency = int(data.get('concurrency', 4))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'concurrency必须是整数'}), 400
+        concurrency = max(1, min(concurrency, MAX_PAGE_CONCURRENCY))
+        bypass_cache = bool(data.get('bypass_cache', False))
+        streaming = bool(data.get('streaming', False))
+        
+        scraper = EbayScraper(bypass_cache=bypass_cache, streaming=streaming)
+        batch_results = scraper.scrape_batch(searches, concurrency=concurrency)
+        
+        results = []
+        merged_titles = []
+        # 合并结果同样按商品ID去重：同一商品在不同搜索中的标题可能不同，不同商品的标题也可能相同
+        merged_seen = SeenItemSet()
+        total_successful_pages = 0
+        for (url, max_pages), (titles, item_ids, successful_pages) in zip(searches, batch_results):
+            results.append({
+                'url': url,
+                'max_pages': max_pages,
+                'titles': titles,
+                'count': len(titles),
+                'successful_pages': successful_pages
+            })
+            merged_titles.extend(scraper.dedupe(titles, item_ids, merged_seen))
+            total_successful_pages += successful_pages
+        
+        if not merged_titles:
+            return jsonify({
+                'error': '未能抓取到任何商品标题，请检查URL是否正确或稍后重试',
+                'results': results,
+                'successful_pages': total_successful_pages
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'merged_titles': merged_titles,
+            'count': len(merged_titles),
+            'successful_pages': total_successful_pages,
+            'message': f'成功抓取{len(searches)}个搜索共{total_successful_pages}页，合并去重后共{len(merged_titles)}个商品标题'
         })
         
+    except Exception as e:
+        logger.error(f"批量抓取过程中发生错误: {str(e)}")
+        return jsonify({'error': f'批量抓取失败: {str(e)}'}), 500
+
+@scraper_bp.route('/scrape-marketplaces', methods=['POST'])
+def scrape_ebay_marketplaces():
+    """在多个eBay站点上搜索同一个关键词，并发抓取后按站点返回标题，可选按站点统计关键词"""
+    try:
+        data = request.get_json()
+        if not data or not str(data.get('query') or '').strip():
+            return jsonify({'error': '请提供搜索关键词'}), 400
+        query = str(data['query']).strip()
+        
+        requested = data.get('marketplaces') or ['ebay.com']
+        if isinstance(requested, str):
+            requested = [part for part in requested.split(',') if part.strip()]
+        if not isinstance(requested, list):
+            return jsonify({'error': 'marketplaces必须是站点列表'}), 400
+        
+        marketplaces = []
+        for name in requested:
+            marketplace = normalize_marketplace(str(name))
+            if marketplace is None:
+                return jsonify({
+                    'error': f'不支持的站点: {name}',
+                    'supported_marketplaces': list(MARKETPLACES)
+                }), 400
+            if marketplace not in marketplaces:
+                marketplaces.append(marketplace)
+        
+        try:
+            max_pages = int(data.get('max_pages', 4))
+            concurrency = int(data.get('concurrency', 4))
+            top_n = int(data.get('top_n', 50))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'max_pages、concurrency和top_n必须是整数'}), 400
+        max_pages = max(1, min(max_pages, MAX_PAGES_LIMIT))
+        concurrency = max(1, min(concurrency, MAX_PAGE_CONCURRENCY))
+        top_n = max(1, min(top_n, MAX_TOP_KEYWORDS))
+        try:
+            extra_target_langs = parse_target_langs(data.get('target_langs'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        bypass_cache = bool(data.get('bypass_cache', False))
+        streaming = bool(data.get('streaming', False))
+        analyze = bool(data.get('analyze', False))
+        
+        # 额外的搜索参数（如排序_sop、每页数量_ipg）对所有站点生效
+        extra_params = data.get('params') or {}
+        if not isinstance(extra_params, dict):
+            return jsonify({'error': 'params必须是对象'}), 400
+        
+        searches = [(build_search_url(marketplace, query, extra_params), max_pages) for marketplace in marketplaces]
+        
+        # 各站点域名不同，每个站点各自受host_throttle并发上限、限速和熔断控制，互不影响
+        scraper = EbayScraper(bypass_cache=bypass_cache, streaming=streaming)
+        batch_results = scraper.scrape_batch(searches, concurrency=concurrency)
+        
+        results = []
+        total_successful_pages = 0
+        for marketplace, (url, _), (titles, _, successful_pages) in zip(marketplaces, searches, batch_results):
+            results.append({
+                'marketplace': marketplace,
+                'url': url,
+                'titles': titles,
+                'count': len(titles),
+                'successful_pages': successful_pages
+            })
+            total_successful_pages += successful_pages
+        total_titles = sum(result['count'] for result in results)
+        
+        if not total_titles:
+            return jsonify({
+                'error': '未能在任何站点抓取到商品标题，请检查关键词或稍后重试',
+                'results': results,
+                'successful_pages': total_successful_pages
+            }), 404
+        
+        if analyze:
+            analyzer = TitleAnalyzer()
+            analyses = analyzer.analyze_title_groups(
+                {result['marketplace']: result['titles'] for result in results},
+                {marketplace: MARKETPLACES[marketplace]['language'] for marketplace in marketplaces},
+                top_n,
+                extra_target_langs
+            )
+            for result in results:
+                result['analysis'] = analyses[result['marketplace']]
+        
+        return jsonify({
+            'success': True,
+            'query': query,
+            'results': results,
+            'count': total_titles,
+            'successful_pages': total_successful_pages,
+            'message': f'成功抓取{len(marketplaces)}个站点共{total_successful_pages}页，共{total_titles}个商品标题'
+        })
+    
+    except Exception as e:
+        logger.error(f"多站点抓取过程中发生错误: {str(e)}")
+        return jsonify({'error': f'多站点抓取失败: {str(e)}'}), 500
+
+def format_sse(event, payload):
+    """按Server-Sent Events格式编码一个事件"""
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@scraper_bp.route('/scrape-stream', methods=['GET', 'POST'])
+def scrape_ebay_stream():
+    """eBay商品标题抓取API端点（SSE流式返回，每抓取完一页就推送该页标题）"""
+    try:
+        data = request.get_json(silent=True) if request.method == 'POST' else request.args
+        if not data or 'url' not in data:
+            return jsonify({'error': '请提供eBay页面URL'}), 400
+        
+        url = data['url'].strip()
+        
+        # 验证URL是否为eBay域名
+        parsed_url = urlparse(url)
+        if not parsed_url.netloc or 'ebay' not in parsed_url.netloc.lower():
+            return jsonify({'error': '请提供有效的eBay页面URL'}), 400
+        
+        # 抓取页数和页面并发数（可选参数）
+        try:
+            max_pages = int(data.get('max_pages', 4))
+            concurrency = int(data.get('concurrency', 1))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'max_pages和concurrency必须是整数'}), 400
+        max_pages = max(1, min(max_pages, MAX_PAGES_LIMIT))
+        concurrency = max(1, min(concurrency, MAX_PAGE_CONCURRENCY))
+        bypass_cache = str(data.get('bypass_cache', False)).lower() in ('1', 'true', 'yes')
+        streaming = str(data.get('streaming', False)).lower() in ('1', 'true', 'yes')
+        
+        scraper = EbayScraper(bypass_cache=bypass_cache, streaming=streaming)
+        
+        def generate():
+            # 只保留已推送商品的ID集合用于跨页去重，不在内存中拼接完整结果
+            seen = SeenItemSet()
+            successful_pages = 0
+            completed_pages = 0
+            try:
+                for page_num, titles, item_ids in scraper.iter_page_titles(url, max_pages, concurrency):
+                    completed_pages += 1
+                    new_titles = []
+                    if titles:
+                        successful_pages += 1
+                        new_titles = scraper.dedupe(titles, item_ids, seen)
+                    
+                    yield format_sse('page', {
+                        'page': page_num,
+                        'titles': new_titles,
+                        'success': titles is not None,
+                        'completed_pages': completed_pages,
+                        'total_pages': max_pages
+                    })
+                
+                # 结束事件与/api/scrape的返回保持一致（标题已随page事件推送）
+                if not seen:
+                    yield format_sse('error', {
+                        'error': '未能抓取到任何商品标题，请检查URL是否正确或稍后重试',
+                        'successful_pages': successful_pages
+                    })
+                else:
+                    yield format_sse('summary', {
+                        'success': True,
+                        'count': len(seen),
+                        'successful_pages': successful_pages,
+                        'message': f'成功抓取{successful_pages}页，共获得{len(seen)}个商品标题'
+                    })
+            
+            except Exception as e:
+                logger.error(f"流式抓取过程中发生错误: {str(e)}")
+                yield format_sse('error', {'error': f'抓取失败: {str(e)}'})
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        
     except Exception as e:
         logger.error(f"抓取过程中发生错误: {str(e)}")
         return jsonify({'error': f'抓取失败: {str(e)}'}), 500
 
+@scraper_bp.route('/health', methods=['GET'])
+def health():
+    """健康检查：返回各目标域名的熔断状态"""
+    try:
+        circuits = circuit_breaker.get_stats()
+        degraded = any(circuit['state'] != STATE_CLOSED for circuit in circuits.values())
+        return jsonify({
+            'success': True,
+            'status': 'degraded' if degraded else 'ok',
+            'circuits': circuits
+        })
+    except Exception as e:
+        logger.error(f"健康检查失败: {str(e)}")
+        return jsonify({'error': f'健康检查失败: {str(e)}'}), 500
+
+@scraper_bp.route('/pool-stats', methods=['GET'])
+def pool_stats():
+    """返回共享HTTP连接池、页面缓存和限速器的统计信息"""
+    try:
+        return jsonify({
+            'success': True,
+            'pool': get_http_pool().get_stats(),
+            'page_cache': get_page_cache().get_stats(),
+            'rate_limiter': rate_limiter.get_stats()
+        })
+    except Exception as e:
+        logger.error(f"获取连接池统计失败: {str(e)}")
+        return jsonify({'error': f'获取统计失败: {str(e)}'}), 500
+
 @scraper_bp.route('/analyze', methods=['POST'])
 def analyze_titles():
     """分析标题并提供分词统计和翻译"""
@@ -585,11 +1576,22 @@ def analyze_titles():
             logger.error("标题列表为空")
             return jsonify({'error': '标题列表不能为空'}), 400
         
+        try:
+            top_n = int(data.get('top_n', 50))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'top_n必须是整数'}), 400
+        top_n = max(1, min(top_n, MAX_TOP_KEYWORDS))
+        
+        try:
+            extra_target_langs = parse_target_langs(data.get('target_langs'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         logger.info(f"开始分析{len(titles)}个标题")
         
         # 创建分析器实例并进行分析
         analyzer = TitleAnalyzer()
-        analysis_result = analyzer.analyze_titles(titles)
+        analysis_result = analyzer.analyze_titles(titles, top_n, extra_target_langs)
         
         logger.info(f"分析完成，找到{len(analysis_result.get('top_keywords', []))}个关键词")
         
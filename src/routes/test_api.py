@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
 import logging
+from src.utils.translator_registry import translator_registry
 
 test_bp = Blueprint('test', __name__)
 
@@ -47,15 +48,9 @@ def analyze_simple():
         # 导入必要的模块
         from collections import Counter
         import re
-        import deepl
         
-        # 初始化DeepL客户端
-        try:
-            deepl_client = deepl.Translator("55f08e38-e61d-4259-be1f-df716be00456:fx")
-            logger.info("DeepL客户端初始化成功")
-        except Exception as e:
-            logger.error(f"DeepL客户端初始化失败: {str(e)}")
-            deepl_client = None
+        # 使用进程内共享的DeepL客户端，未配置时为None
+        deepl_client = translator_registry.get()
         
         # 简单的关键词分析
         all_words = []
@@ -0,0 +1,137 @@
+import os
+import time
+import threading
+import logging
+import requests
+from urllib.parse import urlparse
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 熔断配置（可通过环境变量覆盖）
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get('SCRAPER_BREAKER_THRESHOLD', 5))     # 连续失败多少次后熔断
+BREAKER_RESET_TIMEOUT = float(os.environ.get('SCRAPER_BREAKER_RESET', 30))          # 熔断后多久允许探测（秒）
+BREAKER_HALF_OPEN_PROBES = int(os.environ.get('SCRAPER_BREAKER_PROBES', 1))         # 半开状态下同时允许的探测请求数
+
+# 页面不存在，不能说明域名被阻断或出错；其他4xx（如403）通常是反爬虫拦截，按失败计算
+NEUTRAL_STATUS_CODES = {404}
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+class CircuitOpenError(requests.RequestException):
+    """目标域名处于熔断状态，请求被直接拒绝"""
+
+class HostCircuit:
+    """单个域名的熔断状态"""
+    def __init__(self):
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0
+        self.probes_in_flight = 0
+        self.rejected = 0
+        self.total_failures = 0
+
+class CircuitBreaker:
+    """按域名的熔断器：连续失败达到阈值后熔断，冷却后放行少量探测请求"""
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT,
+                 half_open_probes=BREAKER_HALF_OPEN_PROBES):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._lock = threading.Lock()
+        self._circuits = {}
+    
+    def _circuit(self, url):
+        """获取域名对应的熔断状态（调用方需持有锁）"""
+        host = urlparse(url).netloc.lower()
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = HostCircuit()
+            self._circuits[host] = circuit
+        return circuit, host
+    
+    def _reject(self, circuit, host):
+        circuit.rejected += 1
+        retry_in = max(0.0, circuit.opened_at + self.reset_timeout - time.monotonic())
+        raise CircuitOpenError(f"{host}已熔断，{retry_in:.0f}秒后重试")
+    
+    def raise_if_open(self, url):
+        """熔断打开且冷却未结束时直接拒绝，不占用探测名额"""
+        with self._lock:
+            circuit, host = self._circuit(url)
+            if circuit.state == STATE_OPEN and time.monotonic() - circuit.opened_at < self.reset_timeout:
+                self._reject(circuit, host)
+    
+    def before_request(self, url):
+        """发送请求前调用：熔断时抛出CircuitOpenError，半开时占用一个探测名额"""
+        with self._lock:
+            circuit, host = self._circuit(url)
+            if circuit.state == STATE_OPEN:
+                if time.monotonic() - circuit.opened_at < self.reset_timeout:
+                    self._reject(circuit, host)
+                circuit.state = STATE_HALF_OPEN
+                circuit.probes_in_flight = 0
+                logger.info(f"{host}熔断冷却结束，进入半开状态")
+            
+            if circuit.state == STATE_HALF_OPEN:
+                if circuit.probes_in_flight >= self.half_open_probes:
+                    self._reject(circuit, host)
+                circuit.probes_in_flight += 1
+    
+    def record_response(self, url, status_code, blocked=False):
+        """根据响应记录成功或失败：被重定向到拦截/错误页、5xx和除404外的4xx都算失败，只有未被拦截的2xx/3xx算成功"""
+        if blocked or (status_code >= 400 and status_code not in NEUTRAL_STATUS_CODES):
+            self.record_failure(url)
+        elif status_code >= 400:
+            self.release_probe(url)
+        else:
+            self.record_success(url)
+    
+    def release_probe(self, url):
+        """请求结束但不能说明域名是否正常：不改变连续失败次数，只归还半开状态下占用的探测名额"""
+        with self._lock:
+            circuit, _ = self._circuit(url)
+            if circuit.state == STATE_HALF_OPEN and circuit.probes_in_flight > 0:
+                circuit.probes_in_flight -= 1
+    
+    def record_success(self, url):
+        with self._lock:
+            circuit, host = self._circuit(url)
+            if circuit.state != STATE_CLOSED:
+                logger.info(f"{host}探测请求成功，熔断恢复")
+            circuit.state = STATE_CLOSED
+            circuit.consecutive_failures = 0
+            circuit.probes_in_flight = 0
+    
+    def record_failure(self, url):
+        with self._lock:
+            circuit, host = self._circuit(url)
+            circuit.consecutive_failures += 1
+            circuit.total_failures += 1
+            if circuit.state == STATE_HALF_OPEN or circuit.consecutive_failures >= self.failure_threshold:
+                if circuit.state != STATE_OPEN:
+                    logger.warning(f"{host}连续失败{circuit.consecutive_failures}次，触发熔断")
+                circuit.state = STATE_OPEN
+                circuit.opened_at = time.monotonic()
+                circuit.probes_in_flight = 0
+    
+    def get_stats(self):
+        """返回各域名的熔断状态"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                host: {
+                    'state': circuit.state,
+                    'consecutive_failures': circuit.consecutive_failures,
+                    'total_failures': circuit.total_failures,
+                    'rejected': circuit.rejected,
+                    'retry_in': round(max(0.0, circuit.opened_at + self.reset_timeout - now), 1)
+                    if circuit.state == STATE_OPEN else 0
+                }
+                for host, circuit in self._circuits.items()
+            }
+
+circuit_breaker = CircuitBreaker()
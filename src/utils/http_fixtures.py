@@ -0,0 +1,200 @@
+import io
+import os
+import gzip
+import json
+import time
+import random
+import hashlib
+import threading
+import logging
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from src.utils.page_cache import normalize_url
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 录制/回放配置（可通过环境变量覆盖）
+HTTP_MODE = os.environ.get('SCRAPER_HTTP_MODE', 'live')                        # live / record / replay
+FIXTURE_DIR = os.environ.get(
+    'SCRAPER_FIXTURE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures', 'srp')
+)
+REPLAY_LATENCY = float(os.environ.get('SCRAPER_REPLAY_LATENCY', 0))            # 回放时每个响应的固定延迟（秒）
+REPLAY_JITTER = float(os.environ.get('SCRAPER_REPLAY_JITTER', 0))              # 在固定延迟上额外增加的最大抖动（秒）
+REPLAY_BANDWIDTH = int(os.environ.get('SCRAPER_REPLAY_BANDWIDTH', 0))          # 回放响应体的传输速度（字节/秒），0表示不限速
+
+HTTP_MODES = ('live', 'record', 'replay')
+# 响应体以解压后的内容保存，这些响应头不再适用
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie'}
+
+class FixtureArchive:
+    """HTTP响应存档：index.json记录请求和响应头，响应体按gzip压缩保存为单独的文件"""
+    def __init__(self, fixture_dir=FIXTURE_DIR):
+        self.fixture_dir = fixture_dir
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._load_index()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.fixture_dir, 'index.json')
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)['responses']
+            logger.info(f"HTTP存档加载完成，共{len(self._entries)}个响应")
+        except FileNotFoundError:
+            self._entries = {}
+
+    def _save_index(self):
+        """写入索引文件（调用方需持有锁）"""
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'responses': self._entries}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def key(self, method, url):
+        return hashlib.sha256(f"{method.upper()} {normalize_url(url)}".encode('utf-8')).hexdigest()[:24]
+
+    def save(self, method, url, status_code, headers, body, reason=None):
+        """保存一个响应，相同请求已存在时覆盖"""
+        key = self.key(method, url)
+        body_name = key + '.html.gz'
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        with open(os.path.join(self.fixture_dir, body_name), 'wb') as f:
+            # 固定mtime，重新录制相同内容时文件保持不变
+            f.write(gzip.compress(body, compresslevel=9, mtime=0))
+
+        with self._lock:
+            self._entries[key] = {
+                'method': method.upper(),
+                'url': url,
+                'status': status_code,
+                'reason': reason,
+                'headers': {name: value for name, value in headers.items() if name.lower() not in DROPPED_HEADERS},
+                'body': body_name
+            }
+            self._save_index()
+        return key
+
+    def load(self, method, url):
+        """返回(元数据, 响应体)，未录制时返回(None, None)"""
+        key = self.key(method, url)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None, None
+        with open(os.path.join(self.fixture_dir, entry['body']), 'rb') as f:
+            return entry, gzip.decompress(f.read())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+class ThrottledBody(io.BytesIO):
+    """按指定速度读取的响应体，用于模拟网络传输时间"""
+    def __init__(self, data, bandwidth=0):
+        super().__init__(data)
+        self.bandwidth = bandwidth
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        if self.bandwidth and chunk:
+            time.sleep(len(chunk) / self.bandwidth)
+        return chunk
+
+class RecordingAdapter(BaseAdapter):
+    """录制模式：通过真实的适配器发送请求，并把完整响应写入存档"""
+    def __init__(self, adapter, archive):
+        super().__init__()
+        self.adapter = adapter
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        response = self.adapter.send(request, **kwargs)
+        # 读取完整响应体后再保存；流式读取的调用方会从已读取的内容中迭代
+        body = response.content
+        self.archive.save(request.method, request.url, response.status_code, response.headers, body, response.reason)
+        logger.info(f"已录制响应: {request.method} {request.url}")
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+class ReplayAdapter(BaseAdapter):
+    """回放模式：从存档返回响应，不访问网络；可配置延迟、抖动和传输速度"""
+    def __init__(self, archive, latency=REPLAY_LATENCY, jitter=REPLAY_JITTER, bandwidth=REPLAY_BANDWIDTH):
+        super().__init__()
+        self.archive = archive
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def response_delay(self, method, url):
+        """同一URL每次回放的延迟相同，保证基准测试可以复现"""
+        if not self.jitter:
+            return self.latency
+        return self.latency + random.Random(self.archive.key(method, url)).uniform(0, self.jitter)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry, body = self.archive.load(request.method, request.url)
+        with self._lock:
+            self.stats['hits' if entry else 'misses'] += 1
+
+        delay = self.response_delay(request.method, request.url)
+        if delay:
+            time.sleep(delay)
+
+        response = Response()
+        response.request = request
+        response.url = request.url
+        if entry is None:
+            logger.warning(f"HTTP存档中没有该请求: {request.method} {request.url}")
+            response.status_code = 404
+            response.reason = 'Not Recorded'
+            response.headers = CaseInsensitiveDict({'Content-Type': 'text/plain; charset=utf-8'})
+            body = b''
+        else:
+            response.status_code = entry['status']
+            response.reason = entry.get('reason')
+            response.headers = CaseInsensitiveDict(entry['headers'])
+        response.headers['Content-Length'] = str(len(body))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = ThrottledBody(body, self.bandwidth)
+        return response
+
+    def close(self):
+        pass
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update({
+            'responses': len(self.archive),
+            'latency': self.latency,
+            'jitter': self.jitter,
+            'bandwidth': self.bandwidth
+        })
+        return stats
+
+def create_adapter(live_adapter, mode=HTTP_MODE, fixture_dir=FIXTURE_DIR):
+    """按HTTP模式返回Session使用的适配器：live直接使用真实适配器，record和replay使用存档"""
+    if mode not in HTTP_MODES:
+        raise ValueError(f"不支持的HTTP模式: {mode}")
+    if mode == 'live':
+        return live_adapter
+
+    archive = FixtureArchive(fixture_dir)
+    logger.info(f"HTTP{'录制' if mode == 'record' else '回放'}模式，存档目录: {fixture_dir}")
+    if mode == 'record':
+        return RecordingAdapter(live_adapter, archive)
+    live_adapter.close()
+    return ReplayAdapter(archive)
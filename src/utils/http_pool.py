@@ -0,0 +1,200 @@
+import os
+import time
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.poolmanager import PoolManager
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+from src.utils.http_fixtures import HTTP_MODE, FIXTURE_DIR, create_adapter
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 连接池配置（可通过环境变量覆盖）
+POOL_HOSTS = int(os.environ.get('SCRAPER_POOL_HOSTS', 10))            # 缓存的域名连接池数量
+POOL_MAXSIZE = int(os.environ.get('SCRAPER_POOL_MAXSIZE', 8))         # 每个域名的最大连接数
+POOL_MAX_IDLE = float(os.environ.get('SCRAPER_POOL_MAX_IDLE', 60))    # 空闲连接的最长保留时间（秒）
+POOL_TIMEOUT = float(os.environ.get('SCRAPER_POOL_TIMEOUT', 30))      # 连接全部被占用时等待空闲连接的最长时间（秒）
+
+# 模拟浏览器的默认请求头，进程内只构建一次
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'Accept-Language': 'en-US,en;q=0.9,zh-CN;q=0.8,zh;q=0.7',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0'
+}
+
+class PoolStats:
+    """连接池统计：复用次数、新建连接数、等待次数、空闲淘汰数"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'new_connections': 0, 'waits': 0, 'evictions': 0}
+    
+    def record(self, name):
+        with self._lock:
+            self._counters[name] += 1
+    
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self._counters)
+        checkouts = counters['hits'] + counters['new_connections']
+        counters['checkouts'] = checkouts
+        counters['hit_ratio'] = round(counters['hits'] / checkouts, 4) if checkouts else 0
+        return counters
+
+class TrackedPoolMixin:
+    """在urllib3连接池上记录统计信息并淘汰空闲过久的连接"""
+    stats = None
+    max_idle = POOL_MAX_IDLE
+    pool_timeout = POOL_TIMEOUT
+    
+    def _get_conn(self, timeout=None):
+        # 队列为空说明所有连接都在使用中，本次获取需要等待
+        if self.block and self.pool is not None and self.pool.empty():
+            self.stats.record('waits')
+        
+        # requests不会传入等待时间，未归还的连接会让后续请求永远阻塞，这里改为有限等待
+        if timeout is None:
+            timeout = self.pool_timeout
+        conn = super()._get_conn(timeout)
+        
+        last_used = getattr(conn, '_pool_last_used', None)
+        if last_used is not None and time.monotonic() - last_used > self.max_idle:
+            conn.close()
+            self.stats.record('evictions')
+        conn._pool_last_used = None
+        
+        # 仍然保持着socket的连接即为复用，否则会在发送请求时新建连接
+        if getattr(conn, 'sock', None) is not None:
+            self.stats.record('hits')
+        else:
+            self.stats.record('new_connections')
+        return conn
+    
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn._pool_last_used = time.monotonic()
+        super()._put_conn(conn)
+
+class TrackedHTTPConnectionPool(TrackedPoolMixin, HTTPConnectionPool):
+    pass
+
+class TrackedHTTPSConnectionPool(TrackedPoolMixin, HTTPSConnectionPool):
+    pass
+
+class TrackedPoolManager(PoolManager):
+    """使用带统计功能连接池的PoolManager"""
+    def __init__(self, *args, stats=None, max_idle=POOL_MAX_IDLE, pool_timeout=POOL_TIMEOUT, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+        self.max_idle = max_idle
+        self.pool_timeout = pool_timeout
+        self.pool_classes_by_scheme = {
+            'http': TrackedHTTPConnectionPool,
+            'https': TrackedHTTPSConnectionPool
+        }
+    
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context)
+        pool.stats = self.stats
+        pool.max_idle = self.max_idle
+        pool.pool_timeout = self.pool_timeout
+        return pool
+
+class TrackedHTTPAdapter(HTTPAdapter):
+    """挂载TrackedPoolManager的requests适配器"""
+    def __init__(self, stats, max_idle=POOL_MAX_IDLE, pool_timeout=POOL_TIMEOUT, **kwargs):
+        self.stats = stats
+        self.max_idle = max_idle
+        self.pool_timeout = pool_timeout
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        
+        self.poolmanager = TrackedPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            stats=self.stats,
+            max_idle=self.max_idle,
+            pool_timeout=self.pool_timeout,
+            **pool_kwargs
+        )
+    
+    def send(self, request, **kwargs):
+        try:
+            return super().send(request, **kwargs)
+        except EmptyPoolError as e:
+            # 转换为requests异常，调用方按普通网络错误处理，不会一直挂起
+            raise requests.ConnectionError(f"等待空闲连接超时: {e}", request=request)
+
+class HttpPool:
+    """进程内共享的HTTP连接池，所有抓取器从这里借用Session"""
+    def __init__(self, pool_hosts=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE, max_idle=POOL_MAX_IDLE, headers=None,
+                 http_mode=HTTP_MODE, fixture_dir=FIXTURE_DIR, pool_timeout=POOL_TIMEOUT):
+        self.pool_hosts = pool_hosts
+        self.pool_maxsize = pool_maxsize
+        self.max_idle = max_idle
+        self.pool_timeout = pool_timeout
+        self.http_mode = http_mode
+        self.stats = PoolStats()
+        
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        
+        # 连接数达到上限时等待空闲连接（最多pool_timeout秒），而不是临时新建连接
+        adapter = TrackedHTTPAdapter(
+            self.stats,
+            max_idle=max_idle,
+            pool_timeout=pool_timeout,
+            pool_connections=pool_hosts,
+            pool_maxsize=pool_maxsize,
+            pool_block=True
+        )
+        # 录制/回放模式下用存档适配器包装或替换真实适配器
+        self.adapter = create_adapter(adapter, http_mode, fixture_dir)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        logger.info(f"HTTP连接池初始化成功，每个域名最多{pool_maxsize}个连接")
+    
+    def get_stats(self):
+        """返回连接池统计信息"""
+        stats = self.stats.snapshot()
+        stats.update({
+            'pool_hosts': self.pool_hosts,
+            'pool_maxsize': self.pool_maxsize,
+            'max_idle': self.max_idle,
+            'pool_timeout': self.pool_timeout,
+            'http_mode': self.http_mode
+        })
+        if self.http_mode == 'replay':
+            stats['replay'] = self.adapter.get_stats()
+        return stats
+    
+    def close(self):
+        self.session.close()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_http_pool():
+    """获取进程内共享的连接池（延迟初始化）"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HttpPool()
+    return _pool
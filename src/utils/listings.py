@@ -0,0 +1,99 @@
+import re
+from dataclasses import dataclass, asdict
+
+# 商品详情页链接中的商品ID：/itm/123456789012 或 /itm/商品标题/123456789012
+ITEM_ID_RE = re.compile(r'/itm/(?:[^/?#]+/)?(\d{9,15})(?=[/?#]|$)')
+SOLD_RE = re.compile(r'(\d[\d,.]*)\+?\s*sold', re.IGNORECASE)
+WATCH_RE = re.compile(r'(\d[\d,.]*)\+?\s*watch', re.IGNORECASE)
+SHIPPING_RE = re.compile(r'delivery|shipping|postage', re.IGNORECASE)
+# 价格数字，千位分隔符可以是逗号、点或空格（如"1 299,00"）
+PRICE_NUMBER_RE = re.compile(r'\d(?:[\d,.]|[\s\u00a0\u202f](?=\d{3}\b))*')
+
+# 商品卡片中各字段对应的class关键字（新版s-card布局和旧版s-item布局）
+PRICE_CLASSES = ('s-card__price', 's-item__price')
+SHIPPING_CLASSES = ('s-item__shipping', 's-item__logisticsCost', 's-item__freeXDays')
+CONDITION_CLASSES = ('s-card__subtitle', 'SECONDARY_INFO')
+
+@dataclass(slots=True)
+class ListingRecord:
+    """搜索结果中的一条商品记录"""
+    title: str
+    item_id: str = None
+    url: str = None
+    price: str = None
+    price_value: float = None
+    shipping: str = None
+    condition: str = None
+    sold_count: int = None
+    watch_count: int = None
+    
+    def to_dict(self):
+        return asdict(self)
+
+def parse_count(text):
+    """把"1,234"/"1.234"这样的计数文本转换为整数"""
+    digits = re.sub(r'\D', '', text or '')
+    return int(digits) if digits else None
+
+def parse_price(text):
+    """从价格文本中解析数值，兼容1,234.56和1.234,56两种格式；价格区间取第一个值"""
+    match = PRICE_NUMBER_RE.search(text or '')
+    if not match:
+        return None
+    number = match.group(0).rstrip('.,')
+    # 最后一个分隔符后面只有1-2位数字时视为小数点，其余分隔符都是千位分隔符
+    decimal_match = re.search(r'[.,](\d{1,2})$', number)
+    if decimal_match:
+        integer_part = re.sub(r'\D', '', number[:decimal_match.start()])
+        number = f"{integer_part or '0'}.{decimal_match.group(1)}"
+    else:
+        number = re.sub(r'\D', '', number)
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+def parse_item_id(href):
+    """从商品详情页链接中解析商品ID"""
+    match = ITEM_ID_RE.search(href or '')
+    return match.group(1) if match else None
+
+def _has_class(class_value, keywords):
+    return any(keyword in class_value for keyword in keywords)
+
+def build_listing(title, nodes):
+    """根据标题所在商品卡片中各元素的(class, 文本, 链接)构造商品记录
+    
+    按class匹配的字段取第一个命中的元素；按文本匹配的字段取最后一个命中的元素，即包含该文本的最内层元素
+    """
+    record = ListingRecord(title=title)
+    shipping_from_class = False
+    for class_value, text, href in nodes:
+        if href and record.item_id is None:
+            record.item_id = parse_item_id(href)
+            if record.item_id:
+                record.url = href.split('?', 1)[0]
+        if not text or text == title:
+            continue
+        
+        if record.price is None and _has_class(class_value, PRICE_CLASSES):
+            record.price = text
+        elif record.condition is None and _has_class(class_value, CONDITION_CLASSES):
+            record.condition = text
+        
+        if _has_class(class_value, SHIPPING_CLASSES):
+            if not shipping_from_class:
+                record.shipping = text
+                shipping_from_class = True
+        elif not shipping_from_class and SHIPPING_RE.search(text):
+            record.shipping = text
+        
+        match = SOLD_RE.search(text)
+        if match:
+            record.sold_count = parse_count(match.group(1))
+        match = WATCH_RE.search(text)
+        if match:
+            record.watch_count = parse_count(match.group(1))
+    
+    record.price_value = parse_price(record.price)
+    return record
@@ -0,0 +1,37 @@
+from urllib.parse import urlencode
+
+# 支持的eBay站点：站点域名 -> 搜索页主机名和标题的主要语言（DeepL源语言代码，None表示自动检测）
+MARKETPLACES = {
+    'ebay.com': {'host': 'www.ebay.com', 'language': None},
+    'ebay.co.uk': {'host': 'www.ebay.co.uk', 'language': None},
+    'ebay.com.au': {'host': 'www.ebay.com.au', 'language': None},
+    'ebay.ca': {'host': 'www.ebay.ca', 'language': None},
+    'ebay.ie': {'host': 'www.ebay.ie', 'language': None},
+    'ebay.de': {'host': 'www.ebay.de', 'language': 'DE'},
+    'ebay.at': {'host': 'www.ebay.at', 'language': 'DE'},
+    'ebay.ch': {'host': 'www.ebay.ch', 'language': 'DE'},
+    'ebay.fr': {'host': 'www.ebay.fr', 'language': 'FR'},
+    'ebay.it': {'host': 'www.ebay.it', 'language': 'IT'},
+    'ebay.es': {'host': 'www.ebay.es', 'language': 'ES'},
+    'ebay.nl': {'host': 'www.ebay.nl', 'language': 'NL'},
+    'ebay.pl': {'host': 'www.ebay.pl', 'language': 'PL'}
+}
+
+def normalize_marketplace(name):
+    """把"de"、"ebay.de"、"www.ebay.de"等写法统一为站点域名，不支持的站点返回None"""
+    name = (name or '').strip().lower()
+    if name.startswith('www.'):
+        name = name[len('www.'):]
+    if not name.startswith('ebay.'):
+        name = 'ebay.' + ('com' if name in ('us', 'com') else name)
+    if name == 'ebay.uk':
+        name = 'ebay.co.uk'
+    elif name == 'ebay.au':
+        name = 'ebay.com.au'
+    return name if name in MARKETPLACES else None
+
+def build_search_url(marketplace, query, extra_params=None):
+    """生成站点的搜索结果页URL"""
+    params = {'_nkw': query, '_sacat': 0}
+    params.update(extra_params or {})
+    return f"https://{MARKETPLACES[marketplace]['host']}/sch/i.html?{urlencode(params)}"
@@ -0,0 +1,155 @@
+import os
+import gzip
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 页面缓存配置（可通过环境变量覆盖）
+PAGE_CACHE_DIR = os.environ.get(
+    'PAGE_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'page_cache')
+)
+PAGE_CACHE_TTL = int(os.environ.get('PAGE_CACHE_TTL', 3600))                          # 缓存有效期（秒）
+PAGE_CACHE_MAX_BYTES = int(os.environ.get('PAGE_CACHE_MAX_BYTES', 200 * 1024 * 1024))  # 压缩后的总大小上限
+
+def normalize_url(url):
+    """规范化URL：域名小写、查询参数排序、去掉锚点"""
+    parsed_url = urlparse(url.strip())
+    query = urlencode(sorted(parse_qsl(parsed_url.query, keep_blank_values=True)))
+    return urlunparse((
+        parsed_url.scheme.lower(),
+        parsed_url.netloc.lower(),
+        parsed_url.path or '/',
+        parsed_url.params,
+        query,
+        ''
+    ))
+
+class PageCache:
+    """基于本地磁盘的gzip压缩页面缓存，支持TTL和按总大小的LRU淘汰"""
+    def __init__(self, cache_dir=PAGE_CACHE_DIR, ttl=PAGE_CACHE_TTL, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (文件大小, 写入时间)，按最近访问顺序排列
+        self._index = OrderedDict()
+        self._total_bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._load_index()
+    
+    def _load_index(self):
+        """启动时扫描缓存目录，按修改时间重建LRU索引"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.html.gz'):
+                    continue
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, name[:-len('.html.gz')], stat.st_size))
+            for mtime, key, size in sorted(entries):
+                self._index[key] = (size, mtime)
+                self._total_bytes += size
+            logger.info(f"页面缓存加载完成，共{len(self._index)}个页面")
+        except Exception as e:
+            logger.error(f"页面缓存索引加载失败: {str(e)}")
+    
+    def _key(self, url):
+        return hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.html.gz')
+    
+    def _remove(self, key):
+        """删除缓存条目（调用方需持有锁）"""
+        size, _ = self._index.pop(key, (0, 0))
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+    
+    def get(self, url):
+        """读取缓存的页面HTML，未命中或已过期时返回None"""
+        key = self._key(url)
+        try:
+            with self._lock:
+                entry = self._index.get(key)
+                if entry is None:
+                    self._stats['misses'] += 1
+                    return None
+                if time.time() - entry[1] > self.ttl:
+                    self._remove(key)
+                    self._stats['misses'] += 1
+                    return None
+                self._index.move_to_end(key)
+                self._stats['hits'] += 1
+            
+            with open(self._path(key), 'rb') as f:
+                return gzip.decompress(f.read()).decode('utf-8')
+        
+        except Exception as e:
+            logger.warning(f"读取页面缓存失败: {str(e)}")
+            with self._lock:
+                self._remove(key)
+            return None
+    
+    def set(self, url, html_content):
+        """写入页面HTML，超出总大小上限时淘汰最久未使用的页面"""
+        if not html_content:
+            return
+        key = self._key(url)
+        try:
+            data = gzip.compress(html_content.encode('utf-8'), compresslevel=6)
+            # 先写临时文件再重命名，避免并发读取到不完整的文件
+            tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+            
+            with self._lock:
+                size, _ = self._index.pop(key, (0, 0))
+                self._total_bytes -= size
+                self._index[key] = (len(data), time.time())
+                self._total_bytes += len(data)
+                self._stats['writes'] += 1
+                
+                while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                    oldest_key = next(iter(self._index))
+                    self._remove(oldest_key)
+                    self._stats['evictions'] += 1
+        
+        except Exception as e:
+            logger.warning(f"写入页面缓存失败: {str(e)}")
+    
+    def get_stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'pages': len(self._index),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl
+            })
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_page_cache():
+    """获取进程内共享的页面缓存（延迟初始化）"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PageCache()
+    return _cache
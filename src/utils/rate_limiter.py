@@ -0,0 +1,113 @@
+import os
+import time
+import random
+import threading
+import logging
+from urllib.parse import urlparse
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 限速配置（可通过环境变量覆盖），速率单位为每秒请求数
+RATE_LIMIT_INITIAL = float(os.environ.get('SCRAPER_RATE_INITIAL', 1.0))    # 初始速率
+RATE_LIMIT_MIN = float(os.environ.get('SCRAPER_RATE_MIN', 0.1))            # 最低速率
+RATE_LIMIT_MAX = float(os.environ.get('SCRAPER_RATE_MAX', 4.0))            # 最高速率
+RATE_LIMIT_BURST = float(os.environ.get('SCRAPER_RATE_BURST', 2))          # 令牌桶容量
+TARGET_LATENCY = float(os.environ.get('SCRAPER_TARGET_LATENCY', 3.0))      # 超过该响应时间视为服务端变慢
+BACKOFF_BASE = float(os.environ.get('SCRAPER_BACKOFF_BASE', 1.0))          # 重试退避的基准时间（秒）
+BACKOFF_MAX = float(os.environ.get('SCRAPER_BACKOFF_MAX', 30.0))           # 重试退避的最长时间（秒）
+
+# 表示被限流或服务过载的状态码
+THROTTLE_STATUS_CODES = {429, 503}
+
+class TokenBucket:
+    """单个域名的令牌桶，速率会根据响应情况自适应调整"""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self.requests = 0
+        self.throttled = 0
+    
+    def reserve(self):
+        """预约一个令牌，返回需要等待的秒数；令牌可以透支，由后来者排队等待"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        self.requests += 1
+        delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        return max(delay, self.paused_until - now)
+
+class AdaptiveRateLimiter:
+    """进程内共享的按域名自适应限速器（加性增、乘性减）
+    
+    收到429/503或请求失败时速率减半，响应正常且延迟低于目标值时速率缓慢上升
+    """
+    def __init__(self, initial_rate=RATE_LIMIT_INITIAL, min_rate=RATE_LIMIT_MIN, max_rate=RATE_LIMIT_MAX,
+                 burst=RATE_LIMIT_BURST, target_latency=TARGET_LATENCY):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.target_latency = target_latency
+        self.increase_step = initial_rate / 10
+        self._lock = threading.Lock()
+        self._buckets = {}
+    
+    def _bucket(self, url):
+        """获取域名对应的令牌桶（调用方需持有锁）"""
+        host = urlparse(url).netloc.lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self.initial_rate, self.burst)
+            self._buckets[host] = bucket
+        return bucket
+    
+    def reserve_delay(self, url):
+        """为本次请求预约一个令牌，返回发送前需要等待的秒数"""
+        with self._lock:
+            return self._bucket(url).reserve()
+    
+    def record_response(self, url, status_code=None, latency=None, retry_after=None):
+        """根据响应结果调整速率；status_code为None表示网络错误"""
+        with self._lock:
+            bucket = self._bucket(url)
+            if status_code is None or status_code in THROTTLE_STATUS_CODES:
+                bucket.throttled += 1
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+                if retry_after:
+                    bucket.paused_until = max(bucket.paused_until, time.monotonic() + retry_after)
+                logger.warning(f"{urlparse(url).netloc}被限流或请求失败，速率降至{bucket.rate:.2f}次/秒")
+            elif latency is not None and latency > self.target_latency:
+                bucket.rate = max(self.min_rate, bucket.rate * 0.9)
+            elif status_code < 400:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase_step)
+    
+    def backoff_delay(self, attempt):
+        """带完全抖动的指数退避时间"""
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+    
+    def get_stats(self):
+        """返回各域名的当前速率和限流次数"""
+        with self._lock:
+            return {
+                host: {
+                    'rate': round(bucket.rate, 3),
+                    'requests': bucket.requests,
+                    'throttled': bucket.throttled
+                }
+                for host, bucket in self._buckets.items()
+            }
+
+def parse_retry_after(value):
+    """解析Retry-After响应头（只支持秒数格式）"""
+    try:
+        return max(0.0, float(value)) if value else None
+    except (TypeError, ValueError):
+        return None
+
+rate_limiter = AdaptiveRateLimiter()
@@ -0,0 +1,93 @@
+import zlib
+import hashlib
+from array import array
+from bisect import bisect_left
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+from src.utils.page_cache import normalize_url
+
+# 新加入的商品至少积累到多少个时合并进有序数组（数组较大时按其大小的1/8合并）
+PENDING_MERGE_SIZE = 4096
+
+def search_key(url):
+    """同一个搜索的不同页共用一个键：去掉_pgn参数后规范化URL再取哈希"""
+    parsed_url = urlparse(url.strip())
+    query = urlencode([(key, value) for key, value in parse_qsl(parsed_url.query, keep_blank_values=True) if key != '_pgn'])
+    return hashlib.sha256(normalize_url(urlunparse(parsed_url._replace(query=query))).encode('utf-8')).hexdigest()
+
+def item_key(item_id, title):
+    """商品的去重键：有商品ID时为ID，否则为标题的63位哈希（最高位置1，不会与真实商品ID冲突）"""
+    if item_id:
+        return int(item_id)
+    digest = hashlib.sha1(title.encode('utf-8')).digest()
+    return (1 << 63) | (int.from_bytes(digest[:8], 'big') >> 1)
+
+def title_hash(title):
+    """标题的32位哈希，用于判断商品标题是否有变化（0表示未知）"""
+    return zlib.crc32(title.encode('utf-8')) or 1
+
+class SeenItemSet:
+    """已处理商品的集合，用于按商品ID去重和增量抓取
+    
+    商品键按升序保存在uint64数组中，对应的标题哈希保存在uint32数组中（每个商品共12字节，
+    普通set中的int约占70字节）；新加入的商品先放在小字典里，积累到一定数量再合并
+    """
+    def __init__(self, data=b'', hashes=b''):
+        self._ids = array('Q')
+        self._ids.frombytes(data or b'')
+        self._hashes = array('I')
+        self._hashes.frombytes(hashes or b'')
+        if len(self._hashes) != len(self._ids):
+            # 只保存了商品ID的旧数据：标题哈希视为未知
+            self._hashes = array('I', bytes(self._hashes.itemsize * len(self._ids)))
+        self._pending = {}
+    
+    def _index(self, key):
+        index = bisect_left(self._ids, key)
+        return index if index < len(self._ids) and self._ids[index] == key else None
+    
+    def _merge(self):
+        if self._pending:
+            # 已有部分本身有序，Timsort合并两段有序数据接近线性时间
+            keys = self._ids.tolist() + list(self._pending)
+            hashes = self._hashes.tolist() + list(self._pending.values())
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            self._ids = array('Q', [keys[index] for index in order])
+            self._hashes = array('I', [hashes[index] for index in order])
+            self._pending.clear()
+    
+    def update(self, key, key_hash=0):
+        """记录一个商品，返回'new'（之前没有）、'changed'（标题哈希有变化）或None（没有变化）"""
+        index = self._index(key)
+        if index is not None:
+            old_hash = self._hashes[index]
+            if key_hash and old_hash != key_hash:
+                self._hashes[index] = key_hash
+                return 'changed' if old_hash else None
+            return None
+        
+        if key in self._pending:
+            old_hash = self._pending[key]
+            if key_hash and old_hash != key_hash:
+                self._pending[key] = key_hash
+                return 'changed' if old_hash else None
+            return None
+        
+        self._pending[key] = key_hash
+        if len(self._pending) >= max(PENDING_MERGE_SIZE, len(self._ids) // 8):
+            self._merge()
+        return 'new'
+    
+    def add(self, key):
+        """加入一个商品键，返回它之前是否未出现过"""
+        return self.update(key) == 'new'
+    
+    def __contains__(self, key):
+        return self._index(key) is not None or key in self._pending
+    
+    def __len__(self):
+        return len(self._ids) + len(self._pending)
+    
+    def serialize(self):
+        """序列化为(商品键, 标题哈希)两段字节，用于保存到数据库"""
+        self._merge()
+        return self._ids.tobytes(), self._hashes.tobytes()
@@ -0,0 +1,258 @@
+import os
+import threading
+import logging
+from itertools import chain
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    import lxml.html
+except ImportError:  # lxml未安装时回退到BeautifulSoup
+    etree = None
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 默认解析后端（可通过环境变量覆盖）
+DEFAULT_PARSER_BACKEND = os.environ.get('SCRAPER_PARSER_BACKEND', 'lxml')
+# 流式解析时，结果列表结束后最多再读取多少字节寻找分页导航
+STREAM_TAIL_BYTES = int(os.environ.get('SCRAPER_STREAM_TAIL_BYTES', 64 * 1024))
+
+# 标题选择器策略，按优先级排序
+# match接收元素的属性字典；class按原始字符串做子串匹配，与bs4对多值属性的匹配结果一致
+TITLE_STRATEGIES = [
+    # 主要选择器：h3标签中带有textual-display bsig__title__text类的元素
+    {
+        'name': 'primary',
+        'tag': 'h3',
+        'match': lambda attrs: 'textual-display' in attrs['class'] and 'bsig__title__text' in attrs['class']
+    },
+    # 备用选择器1：h3标签中带有s-item__title类的元素
+    {
+        'name': 'backup1',
+        'tag': 'h3',
+        'match': lambda attrs: 's-item__title' in attrs['class']
+    },
+    # 备用选择器2：span标签中role="heading"的元素
+    {
+        'name': 'backup2',
+        'tag': 'span',
+        'match': lambda attrs: attrs['role'] == 'heading'
+    },
+    # 备用选择器3：h3标签中包含item title相关类的元素
+    {
+        'name': 'backup3',
+        'tag': 'h3',
+        'match': lambda attrs: 'item' in attrs['class_lower'] and 'title' in attrs['class_lower']
+    },
+    # 备用选择器4：a标签指向商品详情页（/itm/）
+    {
+        'name': 'backup4',
+        'tag': 'a',
+        'match': lambda attrs: '/itm/' in attrs['href']
+    },
+    # 备用选择器5：通用标题选择器
+    {
+        'name': 'backup5',
+        'tag': 'h3',
+        'match': lambda attrs: any(keyword in attrs['class_lower'] for keyword in ('title', 'name', 'product'))
+    }
+]
+
+# 按标签名分组的策略索引，遍历时每个元素只需检查同标签的策略
+STRATEGIES_BY_TAG = {}
+for _index, _strategy in enumerate(TITLE_STRATEGIES):
+    STRATEGIES_BY_TAG.setdefault(_strategy['tag'], []).append((_index, _strategy['match']))
+CANDIDATE_TAGS = tuple(STRATEGIES_BY_TAG)
+
+def match_strategies(tag_name, class_value, role, href):
+    """返回元素命中的所有策略序号"""
+    attrs = {
+        'class': class_value or '',
+        'class_lower': (class_value or '').lower(),
+        'role': role,
+        'href': href or ''
+    }
+    return [index for index, match in STRATEGIES_BY_TAG.get(tag_name, ()) if match(attrs)]
+
+class BeautifulSoupBackend:
+    """基于BeautifulSoup html.parser的纯Python解析后端"""
+    name = 'html.parser'
+    
+    def parse(self, html_content):
+        return BeautifulSoup(html_content, 'html.parser')
+    
+    def iter_candidates(self, document):
+        """一次遍历文档，按文档顺序返回(元素, 命中的策略序号列表)"""
+        for element in document.find_all(CANDIDATE_TAGS):
+            class_value = element.get('class')
+            if isinstance(class_value, list):
+                class_value = ' '.join(class_value)
+            matched = match_strategies(element.name, class_value, element.get('role'), element.get('href'))
+            if matched:
+                yield element, matched
+    
+    def get_text(self, element):
+        return element.get_text(strip=True)
+
+    def get_pagination_info(self, document):
+        """返回(结果总数文本, 是否有下一页)，页面上没有对应元素时为None"""
+        heading = document.find('h1', class_=lambda x: x and 'srp-controls__count-heading' in x)
+        count_text = heading.get_text(strip=True) if heading else None
+        
+        nav = document.find('nav', class_=lambda x: x and 'pagination' in x)
+        if nav is None:
+            return count_text, None
+        next_links = nav.find_all('a', class_=lambda x: x and 'pagination__next' in x)
+        has_next = any(link.get('href') and link.get('aria-disabled') != 'true' for link in next_links)
+        return count_text, has_next
+
+    def get_item_link(self, element):
+        """返回标题对应的商品详情页链接：依次查找外层和内层的/itm/链接"""
+        links = element.find_parents('a') + ([element] if element.name == 'a' else []) + element.find_all('a')
+        for link in links:
+            href = link.get('href')
+            if href and '/itm/' in href:
+                return href
+        return None
+    
+    def iter_listing_nodes(self, element):
+        """返回标题所在商品卡片（最近的li）中各元素的(class, 文本, 链接)，按文档顺序"""
+        container = element.find_parent('li') or element
+        for node in [container, *container.find_all(True)]:
+            class_value = node.get('class')
+            if isinstance(class_value, list):
+                class_value = ' '.join(class_value)
+            yield class_value or '', node.get_text(strip=True), node.get('href')
+
+class LxmlBackend:
+    """基于lxml（libxml2）的C解析后端"""
+    name = 'lxml'
+    
+    def __init__(self):
+        # 预编译的XPath对象按线程缓存，避免多线程共享同一个求值器
+        self._local = threading.local()
+    
+    def _xpaths(self):
+        compiled = getattr(self._local, 'xpaths', None)
+        if compiled is None:
+            compiled = {
+                # 与bs4的get_text保持一致：不包含script/style/template中的文本和注释
+                'text_nodes': etree.XPath(
+                    './/text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]'
+                ),
+                'count_heading': etree.XPath("//h1[contains(@class, 'srp-controls__count-heading')]"),
+                'pagination': etree.XPath("//nav[contains(@class, 'pagination')]"),
+                'next_links': etree.XPath(".//a[contains(@class, 'pagination__next')]")
+            }
+            self._local.xpaths = compiled
+        return compiled
+    
+    def parse(self, html_content):
+        if not html_content or not html_content.strip():
+            return None
+        try:
+            return lxml.html.document_fromstring(html_content)
+        except ValueError:
+            # 带编码声明的Unicode字符串需要先转成字节
+            return lxml.html.document_fromstring(html_content.encode('utf-8'))
+    
+    def iter_candidates(self, document):
+        """一次遍历文档，按文档顺序返回(元素, 命中的策略序号列表)"""
+        if document is None:
+            return
+        for element in document.iter(*CANDIDATE_TAGS):
+            matched = match_strategies(element.tag, element.get('class'), element.get('role'), element.get('href'))
+            if matched:
+                yield element, matched
+    
+    def get_text(self, element):
+        return ''.join(
+            text for text in (str(node).strip() for node in self._xpaths()['text_nodes'](element)) if text
+        )
+    
+    def get_pagination_info(self, document):
+        """返回(结果总数文本, 是否有下一页)，页面上没有对应元素时为None"""
+        if document is None:
+            return None, None
+        xpaths = self._xpaths()
+        headings = xpaths['count_heading'](document)
+        count_text = self.get_text(headings[0]) if headings else None
+        
+        navs = xpaths['pagination'](document)
+        if not navs:
+            return count_text, None
+        next_links = xpaths['next_links'](navs[0])
+        has_next = any(link.get('href') and link.get('aria-disabled') != 'true' for link in next_links)
+        return count_text, has_next
+
+    def get_item_link(self, element):
+        """返回标题对应的商品详情页链接：依次查找外层和内层的/itm/链接"""
+        for link in chain(element.iterancestors('a'), element.iter('a')):
+            href = link.get('href')
+            if href and '/itm/' in href:
+                return href
+        return None
+    
+    def iter_listing_nodes(self, element):
+        """返回标题所在商品卡片（最近的li）中各元素的(class, 文本, 链接)，按文档顺序"""
+        container = next(element.iterancestors('li'), element)
+        for node in container.iter(etree.Element):
+            yield node.get('class') or '', self.get_text(node), node.get('href')
+
+class StreamingPageParser:
+    """基于lxml HTMLPullParser的增量解析器：边下载边解析，结果列表和分页导航解析完后即可停止下载"""
+    def __init__(self, encoding=None):
+        if etree is None:
+            raise RuntimeError("流式解析需要安装lxml")
+        self._parser = etree.HTMLPullParser(events=('end',), tag=('ul', 'nav'), encoding=encoding)
+        self.bytes_fed = 0
+        self.results_closed = False
+        self.pagination_closed = False
+        self._tail_bytes = 0
+    
+    def feed(self, chunk):
+        """喂入一段响应数据，并检查结果列表和分页导航是否已经结束"""
+        self._parser.feed(chunk)
+        self.bytes_fed += len(chunk)
+        if self.results_closed:
+            self._tail_bytes += len(chunk)
+        
+        for _, element in self._parser.read_events():
+            if element.tag == 'ul' and 'srp-results' in (element.get('class') or ''):
+                self.results_closed = True
+            elif element.tag == 'nav' and 'pagination' in (element.get('class') or ''):
+                self.pagination_closed = True
+    
+    @property
+    def finished(self):
+        """结果列表已结束，且分页导航已解析完或结果列表之后已读取足够多的数据"""
+        return self.results_closed and (self.pagination_closed or self._tail_bytes >= STREAM_TAIL_BYTES)
+    
+    def close(self):
+        """结束解析，返回已读取部分构成的文档（未读取的部分会被自动闭合）"""
+        try:
+            return self._parser.close()
+        except etree.XMLSyntaxError:
+            return None
+
+_backends = {}
+
+def get_parser_backend(name=None):
+    """按名称获取解析后端，lxml不可用时回退到html.parser"""
+    name = name or DEFAULT_PARSER_BACKEND
+    if name == 'lxml' and etree is None:
+        logger.warning("lxml未安装，回退到html.parser解析")
+        name = 'html.parser'
+    
+    backend = _backends.get(name)
+    if backend is None:
+        if name == 'lxml':
+            backend = LxmlBackend()
+        elif name == 'html.parser':
+            backend = BeautifulSoupBackend()
+        else:
+            raise ValueError(f"不支持的解析后端: {name}")
+        _backends[name] = backend
+    return backend
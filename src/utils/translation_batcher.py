@@ -0,0 +1,64 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote_plus
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# DeepL单次请求的限制：最多50条文本，请求体不超过128KiB（留出余量给其他参数）
+DEEPL_MAX_TEXTS = 50
+DEEPL_MAX_REQUEST_BYTES = 120 * 1024
+# 同时发送的翻译请求数（可通过环境变量覆盖）
+DEEPL_BATCH_CONCURRENCY = int(os.environ.get('DEEPL_BATCH_CONCURRENCY', 4))
+# 翻译到单个目标语言的最长等待时间（秒），超时后使用原文
+TRANSLATION_TIMEOUT = float(os.environ.get('TRANSLATION_TIMEOUT', 15))
+
+def chunk_terms(terms, max_texts=DEEPL_MAX_TEXTS, max_bytes=DEEPL_MAX_REQUEST_BYTES):
+    """按条数和请求体大小把词列表切分成多个请求"""
+    chunk = []
+    chunk_bytes = 0
+    for term in terms:
+        # 按表单编码后的长度估算，每条文本另有"text="和"&"的开销
+        term_bytes = len(quote_plus(term)) + 6
+        if chunk and (len(chunk) >= max_texts or chunk_bytes + term_bytes > max_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(term)
+        chunk_bytes += term_bytes
+    if chunk:
+        yield chunk
+
+class TranslationBatcher:
+    """用DeepL的多文本请求批量翻译词列表：每个词作为独立的文本发送，结果与输入一一对应"""
+    def __init__(self, client, concurrency=DEEPL_BATCH_CONCURRENCY):
+        self.client = client
+        self.concurrency = concurrency
+    
+    def _translate_chunk(self, chunk, target_lang, source_lang):
+        try:
+            results = self.client.translate_text(chunk, source_lang=source_lang, target_lang=target_lang)
+        except Exception as e:
+            logger.error(f"翻译{len(chunk)}个词到{target_lang}失败: {str(e)}")
+            return [None] * len(chunk)
+        if len(results) != len(chunk):
+            logger.error(f"翻译结果数量({len(results)})与输入({len(chunk)})不一致，丢弃该批结果")
+            return [None] * len(chunk)
+        return [result.text for result in results]
+    
+    def translate(self, terms, target_lang, source_lang=None):
+        """翻译词列表，返回与输入顺序一致的译文列表；翻译失败的词对应None"""
+        chunks = list(chunk_terms(terms))
+        if not chunks:
+            return []
+        if len(chunks) == 1:
+            chunk_results = [self._translate_chunk(chunks[0], target_lang, source_lang)]
+        else:
+            logger.info(f"{len(terms)}个词分{len(chunks)}批翻译到{target_lang}")
+            with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(chunks)))) as executor:
+                chunk_results = list(executor.map(
+                    lambda chunk: self._translate_chunk(chunk, target_lang, source_lang), chunks
+                ))
+        return [translation for results in chunk_results for translation in results]
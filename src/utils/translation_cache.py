@@ -0,0 +1,201 @@
+import os
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.models.user import db
+from src.models.translation import TranslationCacheEntry
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 翻译缓存配置（可通过环境变量覆盖）
+TRANSLATION_CACHE_SIZE = int(os.environ.get('TRANSLATION_CACHE_SIZE', 20000))    # 进程内LRU保留的翻译条数
+TRANSLATION_CACHE_WARM = int(os.environ.get('TRANSLATION_CACHE_WARM', 5000))     # 启动时从数据库预热的条数
+DEFAULT_ENGINE = 'deepl'
+# 单条SQL中IN列表的长度上限，避免超过SQLite的参数个数限制
+LOOKUP_CHUNK_SIZE = 500
+
+class TranslationCache:
+    """两级翻译缓存：进程内LRU在前，SQLite表在后，只有两级都未命中的词才发送给翻译引擎"""
+    def __init__(self, max_entries=TRANSLATION_CACHE_SIZE, warm_entries=TRANSLATION_CACHE_WARM):
+        self.max_entries = max_entries
+        self.warm_entries = warm_entries
+        self.app = None
+        self._lock = threading.Lock()
+        # (原文, 源语言, 目标语言, 引擎) -> 译文，按最近使用顺序排列
+        self._memory = OrderedDict()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'chars_saved': 0,
+            'chars_translated': 0
+        }
+    
+    def init_app(self, app):
+        """绑定Flask应用，并从数据库加载最近使用的翻译预热进程内缓存"""
+        self.app = app
+        try:
+            with app.app_context():
+                rows = db.session.execute(
+                    select(
+                        TranslationCacheEntry.source_term,
+                        TranslationCacheEntry.source_lang,
+                        TranslationCacheEntry.target_lang,
+                        TranslationCacheEntry.engine,
+                        TranslationCacheEntry.translation
+                    ).order_by(TranslationCacheEntry.last_used_at.desc()).limit(self.warm_entries)
+                ).all()
+            
+            with self._lock:
+                # 从最久未使用的开始放入，最近使用的翻译排在LRU末尾
+                for source_term, source_lang, target_lang, engine, translation in reversed(rows):
+                    self._remember((source_term, source_lang, target_lang, engine), translation)
+            logger.info(f"翻译缓存预热完成，加载{len(rows)}条翻译")
+        except Exception as e:
+            logger.error(f"翻译缓存预热失败: {str(e)}")
+    
+    def _remember(self, key, translation):
+        """写入进程内缓存，超出上限时淘汰最久未使用的翻译（调用方需持有锁）"""
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def _load(self, terms, source_lang, target_lang, engine):
+        """从数据库读取翻译，并更新命中条目的最近使用时间"""
+        found = {}
+        try:
+            with self.app.app_context():
+                for start in range(0, len(terms), LOOKUP_CHUNK_SIZE):
+                    chunk = terms[start:start + LOOKUP_CHUNK_SIZE]
+                    conditions = (
+                        TranslationCacheEntry.source_lang == source_lang,
+                        TranslationCacheEntry.target_lang == target_lang,
+                        TranslationCacheEntry.engine == engine
+                    )
+                    rows = db.session.execute(
+                        select(TranslationCacheEntry.source_term, TranslationCacheEntry.translation)
+                        .where(TranslationCacheEntry.source_term.in_(chunk), *conditions)
+                    ).all()
+                    if not rows:
+                        continue
+                    found.update(rows)
+                    db.session.execute(
+                        update(TranslationCacheEntry)
+                        .where(TranslationCacheEntry.source_term.in_([term for term, _ in rows]), *conditions)
+                        .values(last_used_at=datetime.utcnow())
+                    )
+                db.session.commit()
+        except Exception as e:
+            logger.warning(f"读取翻译缓存失败: {str(e)}")
+        return found
+    
+    def _store(self, translations, source_lang, target_lang, engine):
+        """把新翻译写入数据库，已存在的条目覆盖译文"""
+        try:
+            now = datetime.utcnow()
+            rows = [{
+                'source_term': term,
+                'source_lang': source_lang,
+                'target_lang': target_lang,
+                'engine': engine,
+                'translation': translation,
+                'created_at': now,
+                'last_used_at': now
+            } for term, translation in translations.items()]
+            statement = sqlite_insert(TranslationCacheEntry)
+            statement = statement.on_conflict_do_update(
+                index_elements=['source_term', 'source_lang', 'target_lang', 'engine'],
+                set_={'translation': statement.excluded.translation, 'last_used_at': statement.excluded.last_used_at}
+            )
+            with self.app.app_context():
+                db.session.execute(statement, rows)
+                db.session.commit()
+        except Exception as e:
+            logger.warning(f"写入翻译缓存失败: {str(e)}")
+    
+    def get_many(self, terms, target_lang, source_lang=None, engine=DEFAULT_ENGINE):
+        """查询一批词的翻译，返回{原文: 译文}，只包含命中的词"""
+        source_lang = source_lang or ''
+        found = {}
+        missing = []
+        with self._lock:
+            for term in dict.fromkeys(terms):
+                key = (term, source_lang, target_lang, engine)
+                translation = self._memory.get(key)
+                if translation is None:
+                    missing.append(term)
+                    continue
+                self._memory.move_to_end(key)
+                found[term] = translation
+                self._stats['memory_hits'] += 1
+                self._stats['chars_saved'] += len(term)
+        
+        loaded = self._load(missing, source_lang, target_lang, engine) if missing and self.app is not None else {}
+        with self._lock:
+            for term, translation in loaded.items():
+                self._remember((term, source_lang, target_lang, engine), translation)
+                self._stats['disk_hits'] += 1
+                self._stats['chars_saved'] += len(term)
+            self._stats['misses'] += len(missing) - len(loaded)
+        found.update(loaded)
+        return found
+    
+    def set_many(self, translations, target_lang, source_lang=None, engine=DEFAULT_ENGINE):
+        """保存一批新翻译（{原文: 译文}）"""
+        if not translations:
+            return
+        source_lang = source_lang or ''
+        with self._lock:
+            for term, translation in translations.items():
+                self._remember((term, source_lang, target_lang, engine), translation)
+            self._stats['writes'] += len(translations)
+            self._stats['chars_translated'] += sum(len(term) for term in translations)
+        if self.app is not None:
+            self._store(translations, source_lang, target_lang, engine)
+    
+    def translate(self, terms, target_lang, translate_misses, source_lang=None, engine=DEFAULT_ENGINE):
+        """翻译一批词：先查缓存，未命中的词去重后交给translate_misses批量翻译，返回与输入顺序一致的译文列表
+        
+        translate_misses接收未命中的词列表，返回一一对应的译文列表（翻译失败的词为None），整体无法翻译时返回None；
+        未翻译的词保留原文
+        """
+        found = self.get_many(terms, target_lang, source_lang, engine)
+        misses = [term for term in dict.fromkeys(terms) if term not in found]
+        if misses:
+            logger.info(f"翻译缓存命中{len(found)}个词，{len(misses)}个词需要翻译到{target_lang}")
+            translated = translate_misses(misses)
+            if translated:
+                new_translations = {
+                    term: translation for term, translation in zip(misses, translated) if translation is not None
+                }
+                self.set_many(new_translations, target_lang, source_lang, engine)
+                found.update(new_translations)
+        return [found.get(term, term) for term in terms]
+    
+    def get_stats(self):
+        """返回缓存命中率、节省的字符数等统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        stats['hits'] = stats['memory_hits'] + stats['disk_hits']
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0
+        stats['max_entries'] = self.max_entries
+        if self.app is not None:
+            try:
+                with self.app.app_context():
+                    stats['disk_entries'] = db.session.execute(
+                        select(func.count()).select_from(TranslationCacheEntry)
+                    ).scalar()
+            except Exception as e:
+                logger.warning(f"统计翻译缓存条目失败: {str(e)}")
+        return stats
+
+translation_cache = TranslationCache()
@@ -0,0 +1,100 @@
+import os
+import threading
+import logging
+from concurrent.futures import Future
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 收集并发请求的时间窗口（秒），窗口内同一语言对的词合并为一次上游请求（可通过环境变量覆盖）
+TRANSLATION_BATCH_WINDOW = float(os.environ.get('TRANSLATION_BATCH_WINDOW', 0.02))
+
+class TranslationDispatcher:
+    """进程内共享的翻译调度器：合并并发请求中的词，同一个词同时只翻译一次
+    
+    第一个请求到达后等待一个时间窗口，窗口内各请求的词去重后一起发送给上游，结果再分发给各个请求；
+    已经在等待翻译的词直接共享同一个结果
+    """
+    def __init__(self, window=TRANSLATION_BATCH_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        # (源语言, 目标语言, 引擎) -> 等待发送的批次
+        self._pending = {}
+        # (原文, 源语言, 目标语言, 引擎) -> 该词翻译结果的Future
+        self._inflight = {}
+        self._stats = {
+            'requests': 0,
+            'terms_requested': 0,
+            'terms_shared': 0,
+            'upstream_batches': 0,
+            'terms_sent': 0,
+            'chars_sent': 0
+        }
+    
+    def translate(self, terms, target_lang, translate_batch, source_lang=None, engine='deepl'):
+        """翻译一批词，返回与输入顺序一致的译文列表（翻译失败的词为None）
+        
+        translate_batch接收合并后的词列表，返回一一对应的译文列表；同一批次使用第一个请求提供的translate_batch
+        """
+        group = (source_lang or '', target_lang, engine)
+        futures = {}
+        with self._lock:
+            self._stats['requests'] += 1
+            for term in dict.fromkeys(terms):
+                self._stats['terms_requested'] += 1
+                key = (term,) + group
+                future = self._inflight.get(key)
+                if future is not None:
+                    self._stats['terms_shared'] += 1
+                    futures[term] = future
+                    continue
+                
+                future = Future()
+                self._inflight[key] = future
+                futures[term] = future
+                batch = self._pending.get(group)
+                if batch is None:
+                    batch = {'terms': [], 'translate_batch': translate_batch}
+                    self._pending[group] = batch
+                    timer = threading.Timer(self.window, self._flush, args=(group,))
+                    timer.daemon = True
+                    timer.start()
+                batch['terms'].append(term)
+        
+        results = {term: future.result() for term, future in futures.items()}
+        return [results[term] for term in terms]
+    
+    def _flush(self, group):
+        """时间窗口结束：把该语言对收集到的词一次发送给上游，并把结果分发给等待的请求"""
+        with self._lock:
+            batch = self._pending.pop(group)
+            terms = batch['terms']
+            self._stats['upstream_batches'] += 1
+            self._stats['terms_sent'] += len(terms)
+            self._stats['chars_sent'] += sum(len(term) for term in terms)
+        
+        translations = None
+        try:
+            logger.info(f"合并发送{len(terms)}个词到{group[1]}")
+            translations = batch['translate_batch'](terms)
+        except Exception as e:
+            logger.error(f"合并翻译请求失败: {str(e)}")
+        if not translations or len(translations) != len(terms):
+            translations = [None] * len(terms)
+        
+        with self._lock:
+            for term, translation in zip(terms, translations):
+                self._inflight.pop((term,) + group).set_result(translation)
+    
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['inflight_terms'] = len(self._inflight)
+        stats['window'] = self.window
+        stats['dedup_ratio'] = (
+            round(1 - stats['terms_sent'] / stats['terms_requested'], 4) if stats['terms_requested'] else 0
+        )
+        return stats
+
+translation_dispatcher = TranslationDispatcher()
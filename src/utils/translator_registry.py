@@ -0,0 +1,91 @@
+import os
+import threading
+import logging
+import deepl
+from src.utils.http_pool import TrackedHTTPAdapter, PoolStats
+
+# 配置日志
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 翻译服务配置（可通过环境变量或Flask配置覆盖，密钥不再写在代码中）
+DEEPL_AUTH_KEY = os.environ.get('DEEPL_AUTH_KEY')
+DEEPL_SERVER_URL = os.environ.get('DEEPL_SERVER_URL')                         # 为空时按密钥类型自动选择免费版或专业版地址
+DEEPL_POOL_MAXSIZE = int(os.environ.get('DEEPL_POOL_MAXSIZE', 8))            # 到翻译服务的最大连接数
+
+class TranslatorRegistry:
+    """进程内共享的翻译客户端：首次使用时创建，所有请求和线程复用同一个客户端及其连接池"""
+    def __init__(self, auth_key=DEEPL_AUTH_KEY, server_url=DEEPL_SERVER_URL, pool_maxsize=DEEPL_POOL_MAXSIZE):
+        self.auth_key = auth_key
+        self.server_url = server_url
+        self.pool_maxsize = pool_maxsize
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._connection_stats = PoolStats()
+        self._stats = {'lookups': 0, 'reuses': 0, 'clients_created': 0, 'init_failures': 0}
+    
+    def init_app(self, app):
+        """从Flask配置读取DEEPL_AUTH_KEY和DEEPL_SERVER_URL（未配置时使用环境变量）"""
+        with self._lock:
+            self.auth_key = app.config.get('DEEPL_AUTH_KEY') or self.auth_key
+            self.server_url = app.config.get('DEEPL_SERVER_URL') or self.server_url
+            # 配置变化后重新创建客户端
+            self._close_clients()
+        if not self.auth_key:
+            logger.warning("未配置DEEPL_AUTH_KEY，关键词将不会被翻译")
+    
+    def _create_deepl(self):
+        translator = deepl.Translator(self.auth_key, server_url=self.server_url or None)
+        # 在客户端的Session上挂载带统计的适配器，记录连接复用情况
+        session = getattr(getattr(translator, '_client', None), '_session', None)
+        if session is not None:
+            adapter = TrackedHTTPAdapter(self._connection_stats, pool_connections=2, pool_maxsize=self.pool_maxsize)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        else:
+            logger.warning("无法获取DeepL客户端的Session，连接复用统计不可用")
+        return translator
+    
+    def get(self, engine='deepl'):
+        """返回共享的翻译客户端，未配置密钥或初始化失败时返回None"""
+        if engine != 'deepl':
+            raise ValueError(f"不支持的翻译引擎: {engine}")
+        with self._lock:
+            self._stats['lookups'] += 1
+            client = self._clients.get(engine)
+            if client is not None:
+                self._stats['reuses'] += 1
+                return client
+            if not self.auth_key:
+                return None
+            try:
+                client = self._create_deepl()
+            except Exception as e:
+                self._stats['init_failures'] += 1
+                logger.error(f"DeepL客户端初始化失败: {str(e)}")
+                return None
+            self._clients[engine] = client
+            self._stats['clients_created'] += 1
+            logger.info("DeepL客户端初始化成功")
+            return client
+    
+    def _close_clients(self):
+        """关闭已创建的客户端（调用方需持有锁）"""
+        for client in self._clients.values():
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"关闭翻译客户端失败: {str(e)}")
+        self._clients = {}
+    
+    def get_stats(self):
+        """返回客户端复用次数和到翻译服务的连接复用统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['configured'] = bool(self.auth_key)
+            stats['initialized'] = list(self._clients)
+        stats['connections'] = self._connection_stats.snapshot()
+        stats['pool_maxsize'] = self.pool_maxsize
+        return stats
+
+translator_registry = TranslatorRegistry()
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 测试中抓取的页面写入临时目录，不影响src/database下的页面缓存
+os.environ.setdefault('PAGE_CACHE_DIR', tempfile.mkdtemp(prefix='page-cache-'))
+# 本地桩服务器不需要限速，放宽令牌桶避免测试等待
+os.environ.setdefault('SCRAPER_RATE_INITIAL', '100')
+os.environ.setdefault('SCRAPER_RATE_MAX', '200')
+os.environ.setdefault('SCRAPER_RATE_BURST', '20')
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+from src.routes.scraper import host_throttle
+from src.routes.async_scraper import AsyncEbayScraper, async_engine
+
+ITEMS_PER_PAGE = 20
+
+def srp_title(page_num, index):
+    return f"Philips Hue White Ambiance E27 Smart Bulb Model {page_num}-{index}"
+
+def srp_page(page_num, last_page, pagination=True):
+    """生成eBay搜索结果页；与eBay一样，超出范围的页码返回最后一页"""
+    page_num = min(page_num, last_page)
+    items = ''.join(
+        f'<li class="s-card"><a href="https://www.ebay.com/itm/{300000000000 + page_num * 1000 + index}">'
+        f'<h3 class="textual-display bsig__title__text">{srp_title(page_num, index)}</h3></a>'
+        f'<span class="s-card__price">$19.99</span></li>'
+        for index in range(ITEMS_PER_PAGE)
+    )
+    header = '<header><h3>Shop by category</h3><a href="/sch/ebayadvsearch">Advanced</a></header>'
+    if not pagination:
+        return f'<html><body>{header}<ul class="srp-results">{items}</ul></body></html>'
+    
+    next_link = (
+        f'<a class="pagination__next" href="?_pgn={page_num + 1}">Next</a>' if page_num < last_page
+        else '<a class="pagination__next" aria-disabled="true">Next</a>'
+    )
+    return (
+        f'<html><body>{header}'
+        f'<h1 class="srp-controls__count-heading"><span>{last_page * ITEMS_PER_PAGE}</span> results for hue</h1>'
+        f'<ul class="srp-results">{items}</ul>'
+        f'<nav class="pagination">{next_link}</nav></body></html>'
+    )
+
+class StubSearchServer:
+    """本地桩服务器：返回固定的搜索结果页，并记录请求页码、客户端端口和同时处理的请求数"""
+    def __init__(self, last_page=3, pagination=True, delay=0.0):
+        self.last_page = last_page
+        self.pagination = pagination
+        self.delay = delay
+        self.requests = []
+        self.client_ports = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                page_num = int(parse_qs(urlparse(self.path).query).get('_pgn', ['1'])[0])
+                with stub._lock:
+                    stub.requests.append(page_num)
+                    stub.client_ports.add(self.client_address[1])
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.delay)
+                    body = srp_page(page_num, stub.last_page, stub.pagination).encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def url(self, query='hue'):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/sch/i.html?_nkw={query}&_ipg={ITEMS_PER_PAGE}"
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub_server():
+    servers = []
+    
+    def start(**kwargs):
+        server = StubSearchServer(**kwargs)
+        servers.append(server)
+        return server
+    
+    yield start
+    for server in servers:
+        server.close()
+
+def expected_titles(pages):
+    return [srp_title(page_num, index) for page_num in range(1, pages + 1) for index in range(ITEMS_PER_PAGE)]
+
+async def scrape(url, **kwargs):
+    async with AsyncEbayScraper(bypass_cache=True) as scraper:
+        return await scraper.scrape_titles(url, **kwargs)
+
+def test_scrape_titles_returns_titles_in_page_order(stub_server):
+    server = stub_server(last_page=3)
+    titles, successful_pages = asyncio.run(scrape(server.url(), max_pages=6, concurrency=3))
+    
+    assert titles == expected_titles(3)
+    assert successful_pages == 3
+    # 第1页的结果总数说明只有3页，其余页面不再请求
+    assert sorted(server.requests) == [1, 2, 3]
+
+def test_scrape_titles_stops_at_repeated_page_without_pagination_info(stub_server):
+    server = stub_server(last_page=2, pagination=False)
+    titles, successful_pages = asyncio.run(scrape(server.url(), max_pages=6, concurrency=1))
+    
+    assert titles == expected_titles(2)
+    assert successful_pages == 2
+    # 第3页重复第2页后停止翻页
+    assert server.requests == [1, 2, 3]
+
+def test_concurrent_scrapes_respect_per_host_limit(stub_server):
+    server = stub_server(last_page=8, delay=0.05)
+    
+    async def scrape_many():
+        return await asyncio.gather(*(
+            scrape(server.url(f'hue{index}'), max_pages=8, concurrency=8) for index in range(3)
+        ))
+    
+    results = asyncio.run(scrape_many())
+    
+    assert [successful_pages for _, successful_pages in results] == [8, 8, 8]
+    assert len(server.requests) == 24
+    assert server.peak_in_flight <= host_throttle.max_concurrency
+
+def test_engine_reuses_connections_across_requests(stub_server):
+    server = stub_server(last_page=1)
+    # 每次asyncio.run都使用新的事件循环，与Flask调用异步视图的方式相同
+    for _ in range(3):
+        titles, successful_pages = asyncio.run(async_engine.scrape_titles(server.url(), max_pages=1, bypass_cache=True))
+        assert titles == expected_titles(1)
+        assert successful_pages == 1
+    
+    assert len(server.requests) == 3
+    assert len(server.client_ports) == 1
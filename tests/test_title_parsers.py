@@ -0,0 +1,15 @@
+import pytest
+
+from src.routes.scraper import EbayScraper
+from tests.title_corpus import fixture_pages
+
+FIXTURE_PAGES = fixture_pages()
+
+@pytest.mark.parametrize('url, html_content', FIXTURE_PAGES, ids=[url for url, _ in FIXTURE_PAGES])
+def test_lxml_backend_matches_html_parser(url, html_content):
+    lxml_titles, lxml_info = EbayScraper(parser='lxml').extract_page(html_content)
+    reference_titles, reference_info = EbayScraper(parser='html.parser').extract_page(html_content)
+    
+    assert reference_titles
+    assert lxml_titles == reference_titles
+    assert lxml_info == reference_info
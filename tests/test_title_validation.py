@@ -0,0 +1,13 @@
+from src.routes.scraper import EbayScraper
+from tests.title_corpus import legacy_is_valid_title, title_corpus
+
+def test_is_valid_title_matches_legacy_implementation():
+    scraper = EbayScraper()
+    corpus = title_corpus()
+    
+    mismatches = [title for title in corpus if scraper.is_valid_title(title) != legacy_is_valid_title(title)]
+    
+    assert mismatches == []
+    # 语料同时覆盖有效和无效标题
+    results = {legacy_is_valid_title(title) for title in corpus}
+    assert results == {True, False}